@@ -1,22 +1,17 @@
 import streamlit as st
 import random
 import time
+import threading
 import datetime
-import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
-import plotly.express as px
-from tsp_algorithms import run_tsp_algorithms
-from google.cloud import firestore
+import uuid
 from dotenv import load_dotenv
-from database import db
+
+# Plotting stacks, the solvers and the database client are imported inside
+# the pages that use them, so the welcome page starts without them.
 
 # Load environment variables
 load_dotenv()
 
-# Initialize database connection
-db.initialize_db()
-
 # Initialize session state
 if "page" not in st.session_state:
     st.session_state.page = "welcome" 
@@ -98,6 +93,125 @@ def validate_user_path(user_path, home_city, selected_cities):
 
     return None
 
+# --- Game Instance ---
+def generate_distances(cities):
+    distances = {}
+    for i, city1 in enumerate(cities):
+        for j, city2 in enumerate(cities):
+            if i < j:  
+                dist = random.randint(50, 100)
+                distances[(city1, city2)] = dist
+                distances[(city2, city1)] = dist
+
+    return distances
+
+def start_game_instance():
+    """Draw distances between all cities once per game, before cities are picked"""
+    if "distances" not in st.session_state:
+        from puzzle_bank import open_bank
+
+        # Prefer a banked instance, whose optimal tours are already known
+        bank = open_bank()
+        seeds = bank.seeds() if bank is not None else []
+        if seeds:
+            seed = random.choice(seeds)
+            st.session_state.cities, st.session_state.distances = bank.instance(seed)
+            st.session_state.puzzle_seed = seed
+        else:
+            st.session_state.distances = generate_distances(st.session_state.cities)
+        # Identifies this game instance; doubles as its idempotency key on save
+        st.session_state.game_key = uuid.uuid4().hex
+
+def speculative_solver():
+    """Incremental exact solver kept in step with the city selection"""
+    from distance_matrix import DistanceMatrix
+    from incremental import IncrementalSolver
+
+    cities = st.session_state.cities
+    home_index = cities.index(st.session_state.home_city)
+    solver = st.session_state.get("incremental")
+    if solver is None or solver.home_index != home_index:
+        matrix = DistanceMatrix.from_pairs(cities, st.session_state.distances)
+        selected = [cities.index(city) for city in st.session_state.selected_cities]
+        solver = IncrementalSolver(matrix, home_index, selected)
+        st.session_state.incremental = solver
+    return solver
+
+def algorithm_records(dispatch):
+    """Timings of the algorithms that finished, as saved with a game"""
+    return [
+        (res['algorithm'], res['time'], {
+            "cpu_time": res.get('cpu_time'),
+            "peak_memory": res.get('peak_memory'),
+            "counters": res['counters'] or None
+        })
+        for res in dispatch['results'] if not res['timed_out']
+    ]
+
+def compare_algorithms_in_background(db, dist_matrix, game_id):
+    """
+    Runs the algorithm comparison for a game whose optimal tour is already
+    known, off the render path, and saves its timings when it finishes.
+    The returned dict holds the dispatch result once it is ready.
+    """
+    from tsp_algorithms import INSTRUMENT, dispatch_tsp_algorithms, run_tsp_algorithms_concurrent, solution_cache
+
+    comparison = {"dispatch": None}
+
+    def compare():
+        dispatch = solution_cache.get_or_compute(
+            dist_matrix, 0,
+            lambda: dispatch_tsp_algorithms(
+                dist_matrix, home_index=0, runner=run_tsp_algorithms_concurrent, instrument=INSTRUMENT
+            ),
+            variant="instrumented" if INSTRUMENT else ""
+        )
+        if game_id is not None:
+            db.save_algorithm_performance(game_id, algorithm_records(dispatch))
+        comparison["dispatch"] = dispatch
+
+    threading.Thread(target=compare, name="algorithm-comparison", daemon=True).start()
+    return comparison
+
+# --- Cached Rendering ---
+@st.cache_data(max_entries=64)
+def render_city_map(cities, edges, home):
+    """Draw the city graph once per game instance and return it as PNG bytes"""
+    import io
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(cities)
+    for i, j, d in edges:
+        G.add_edge(i, j, weight=d)
+
+    node_colors = ["red" if node == home else "skyblue" for node in G.nodes()]
+
+    pos = nx.spring_layout(G, seed=42)
+    fig, ax = plt.subplots(figsize=(6, 6))
+    try:
+        nx.draw(G, pos, with_labels=True, node_color=node_colors, node_size=2000, font_size=12, ax=ax)
+        labels = nx.get_edge_attributes(G, 'weight')
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=10, ax=ax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=64)
+def distance_table(cities, edges):
+    """Build the distance matrix frame once per game instance"""
+    import numpy as np
+    import pandas as pd
+    from distance_matrix import DistanceMatrix
+
+    matrix = DistanceMatrix.from_pairs(list(cities), {(i, j): d for i, j, d in edges})
+    return pd.DataFrame(np.asarray(matrix), index=list(cities), columns=list(cities)).astype(str)
+
 # --- Page Navigation Functions ---
 def go_to_name_input():
     st.session_state.page = "name_input"
@@ -187,6 +301,7 @@ elif st.session_state.page == "name_input":
 elif st.session_state.page == "home_city_selection":
     st.title("🏠 Selecting Your Home City...")
 
+    start_game_instance()
     placeholder = st.empty()
     city_list = st.session_state.cities
     for _ in range(20):  # Shuffle animation
@@ -213,11 +328,20 @@ elif st.session_state.page == "select_cities":
 
     remaining_cities = [city for city in st.session_state.cities if city != st.session_state.home_city]
 
+    # Solve each selection as it changes, so evaluation finds the answer ready;
+    # banked puzzles already have every answer
+    start_game_instance()
+    solver = speculative_solver() if st.session_state.get("puzzle_seed") is None else None
+
     def select_city(city):
         if city not in st.session_state.selected_cities:
             st.session_state.selected_cities.append(city)
+            if solver is not None:
+                solver.insert(st.session_state.cities.index(city))
         else:
             st.session_state.selected_cities.remove(city)
+            if solver is not None:
+                solver.remove(st.session_state.cities.index(city))
 
     cols = st.columns(3)
     for i, city in enumerate(remaining_cities):
@@ -264,60 +388,22 @@ elif st.session_state.page == "path_game":
     st.markdown(f"🏠 **Home City:** `{home}`")
     st.markdown(f"🗺️ **Cities to Visit:** `{', '.join(selected)}`")
 
-    def generate_distances(cities):
-        distances = {}
-        for i, city1 in enumerate(cities):
-            for j, city2 in enumerate(cities):
-                if i < j:  
-                    dist = random.randint(50, 100)
-                    distances[(city1, city2)] = dist
-                    distances[(city2, city1)] = dist
-
-        return distances
-
-    if "distances" not in st.session_state:
-        st.session_state.distances = generate_distances(all_cities)
-
+    start_game_instance()
     distances = st.session_state.distances
 
-    G = nx.Graph()
-    G.add_nodes_from(all_cities)
-    for (i, j), d in distances.items():
-        G.add_edge(i, j, weight=d)
-
-    node_colors = []
-    for node in G.nodes():
-        if node == st.session_state.home_city:
-            node_colors.append("red")   
-        else:
-            node_colors.append("skyblue")
+    # Hashable snapshot of this game's instance, used as the render cache key
+    in_game = set(all_cities)
+    edges = tuple(sorted((i, j, d) for (i, j), d in distances.items() if i in in_game and j in in_game))
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("📍 City Map")
-        pos = nx.spring_layout(G, seed=42)
-        fig, ax = plt.subplots(figsize=(6, 6))
-        nx.draw(G, pos, with_labels=True, node_color=node_colors, node_size=2000, font_size=12, ax=ax)
-        labels = nx.get_edge_attributes(G, 'weight')
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=10, ax=ax)
-        st.pyplot(fig)
+        st.image(render_city_map(tuple(all_cities), edges, home))
 
     with col2:
         st.subheader("📏 Distance Matrix")
-        matrix = pd.DataFrame(index=all_cities, columns=all_cities)
-        for i in all_cities:
-            for j in all_cities:
-                if i == j:
-                    matrix.loc[i, j] = 0
-                else:
-                    matrix.loc[i, j] = distances.get((i, j), distances.get((j, i), 0))
-    
-        display_matrix = matrix.copy()
-        for i in all_cities:
-            display_matrix.loc[i, i] = '-'
-        
-        st.dataframe(matrix.astype(str))
+        st.dataframe(distance_table(tuple(all_cities), edges))
         
     st.markdown("### 🚶‍♂️ Your Move!")
     st.markdown("Enter the cities in the order you want to visit (starting and ending at your home city).")
@@ -337,6 +423,14 @@ elif st.session_state.page == "path_game":
     
 # --- Page: Evaluate Path ---
 elif st.session_state.page == "evaluate_path":
+    from database import get_db
+    from distance_matrix import DistanceMatrix
+    from lower_bounds import optimality_gap
+    from tsp_algorithms import (
+        ALGORITHM_COST_MODELS, INSTRUMENT, dispatch_tsp_algorithms, run_tsp_algorithms_concurrent, solution_cache
+    )
+
+    db = get_db()
     
     st.title("🏁 Game Results & Evaluation")
     
@@ -350,22 +444,10 @@ elif st.session_state.page == "evaluate_path":
     city_indices = {city: i for i, city in enumerate(all_cities)}
     city_names = list(city_indices.keys())
 
-    dist_matrix = [[0] * len(city_names) for _ in range(len(city_names))]
-    for (c1, c2), d in distances.items():
-        i, j = city_indices[c1], city_indices[c2]
-        dist_matrix[i][j] = d
-        dist_matrix[j][i] = d
+    dist_matrix = DistanceMatrix.from_pairs(city_names, distances)
 
     def path_distance(path):
-        total = 0
-        for i in range(len(path) - 1):
-            from_city = path[i]
-            to_city = path[i + 1]
-            from_idx = city_indices[from_city]
-            to_idx = city_indices[to_city]
-            d = dist_matrix[from_idx][to_idx]
-            total += d
-        return total
+        return dist_matrix.path_cost([city_indices[city] for city in path])
 
     validation_error = validate_user_path(user_input, home, selected)
     if validation_error:
@@ -374,17 +456,111 @@ elif st.session_state.page == "evaluate_path":
         st.stop()
 
     user_path = [city.strip().upper() for city in user_input.split(",") if city.strip()]
-    user_distance = path_distance(user_path)
 
-    algo_outputs = run_tsp_algorithms(dist_matrix, home_index=0)
-    best_result = min(algo_outputs, key=lambda x: x['cost'])
-    best_path_names = [city_names[i] for i in best_result['path']]
+    if "game_key" not in st.session_state:
+        st.session_state.game_key = uuid.uuid4().hex
+    evaluation_key = (st.session_state.game_key, user_input)
+
+    # Solve and persist once per game; reruns reuse the stored evaluation
+    evaluation = st.session_state.get("evaluation")
+    first_evaluation = evaluation is None or evaluation["key"] != evaluation_key
+    if first_evaluation:
+        user_distance = path_distance(user_path)
+
+        # A banked puzzle needs no solving at all; otherwise prefer the tour
+        # solved while cities were being picked, if it covers this selection
+        precomputed = None
+        banked = None
+        solver = st.session_state.get("incremental")
+        universe = st.session_state.cities
+        if st.session_state.get("puzzle_seed") is not None:
+            from puzzle_bank import open_bank
+
+            bank = open_bank()
+            banked = bank.lookup(st.session_state.puzzle_seed, home, selected) if bank is not None else None
+        if banked is not None:
+            precomputed = {
+                'algorithm': "Puzzle bank",
+                'path': [city_indices[city] for city in banked['path']],
+                'cost': banked['cost']
+            }
+        elif (solver is not None and solver.exact and universe[solver.home_index] == home
+                and sorted(universe[i] for i in solver.cities) == sorted(selected)):
+            precomputed = solver.result()
+            precomputed['algorithm'] = "Held-Karp (incremental)"
+            precomputed['path'] = [city_indices[universe[i]] for i in precomputed['path']]
+
+        # With the answer already known, the comparison runs after the page renders
+        if precomputed is not None:
+            dispatch = {'results': [], 'skipped': [], 'authoritative': None, 'best': precomputed}
+        else:
+            dispatch = solution_cache.get_or_compute(
+                dist_matrix, 0,
+                lambda: dispatch_tsp_algorithms(
+                    dist_matrix, home_index=0, runner=run_tsp_algorithms_concurrent, instrument=INSTRUMENT
+                ),
+                variant="instrumented" if INSTRUMENT else ""
+            )
+        best_result = precomputed or dispatch['best']
+        best_path_names = [city_names[i] for i in best_result['path']]
+
+        end_time = datetime.datetime.now()
+        start_time = st.session_state.get("start_time")
+        time_taken = (end_time - start_time).total_seconds() if start_time else None
 
-    end_time = datetime.datetime.now()
-    start_time = st.session_state.get("start_time")
-    time_taken = (end_time - start_time).total_seconds() if start_time else None
+        # Without an exact result, the user's tour is optimal only if a lower bound certifies it
+        certificate = None
+        if precomputed is not None or ALGORITHM_COST_MODELS[best_result['algorithm']]['exact']:
+            is_optimal = abs(user_distance - best_result['cost']) < 0.001
+        else:
+            certificate = optimality_gap(dist_matrix, [city_indices[city] for city in user_path])
+            is_optimal = certificate['certified']
+
+        game_id = db.queue_game_result(
+            st.session_state.player_name,
+            home,
+            selected,
+            ','.join(user_path),
+            user_distance,
+            is_optimal, 
+            ' -> '.join(best_path_names),
+            best_result['cost'],
+            algorithm_records(dispatch),
+            idempotency_key=st.session_state.game_key
+        )
 
-    is_optimal = abs(user_distance - best_result['cost']) < 0.001
+        comparison = st.session_state.get("comparison")
+        if (precomputed is not None
+                and (comparison is None or comparison["game_key"] != st.session_state.game_key)):
+            comparison = compare_algorithms_in_background(db, dist_matrix, game_id)
+            comparison["game_key"] = st.session_state.game_key
+            st.session_state.comparison = comparison
+
+        evaluation = {
+            "key": evaluation_key,
+            "user_distance": user_distance,
+            "dispatch": dispatch,
+            "best_result": best_result,
+            "best_path_names": best_path_names,
+            "time_taken": time_taken,
+            "is_optimal": is_optimal,
+            "certificate": certificate,
+            "game_id": game_id
+        }
+        st.session_state.evaluation = evaluation
+
+    user_distance = evaluation["user_distance"]
+    dispatch = evaluation["dispatch"]
+    comparison = st.session_state.get("comparison")
+    if not dispatch['results'] and comparison is not None and comparison["dispatch"] is not None:
+        dispatch = comparison["dispatch"]
+    algo_outputs = dispatch['results']
+    best_result = evaluation["best_result"]
+    best_path_names = evaluation["best_path_names"]
+    time_taken = evaluation["time_taken"]
+    is_optimal = evaluation["is_optimal"]
+    certificate = evaluation["certificate"]
+    game_id = evaluation["game_id"]
 
     st.markdown("## 📝 Your Journey Summary")
 
@@ -403,37 +579,44 @@ elif st.session_state.page == "evaluate_path":
         st.markdown(f"**Best Distance:** `{best_result['cost']}` units")
 
     if is_optimal:
-        st.balloons()
+        if first_evaluation:
+            st.balloons()
         st.success("🎉 Amazing ! You found the optimal path!")
+    elif certificate is not None:
+        st.info(
+            f"🔍 Your path is valid. It is at most `{certificate['gap']:.1%}` longer than optimal "
+            f"(lower bound `{certificate['lower_bound']:.1f}` units)."
+        )
     else:
         st.info("🔍 Your path is valid, but not the shortest.")
 
-    game_id = db.save_game_result(
-        st.session_state.player_name,
-        home,
-        selected,
-        ','.join(user_path),
-        user_distance,
-        is_optimal, 
-        ' -> '.join(best_path_names),
-        best_result['cost']
-    )
-
-    if game_id is not None:
-        db.save_algorithm_performance(
-            game_id,
-            [(res['algorithm'], res['time']) for res in algo_outputs]
-        )
-    else:
+    if game_id is None:
         st.error("❌ Failed to save game results. Check database logs.")
         
     with st.expander("📊 See How the Algorithms Performed"):
+        if not algo_outputs:
+            if best_result['algorithm'] == "Puzzle bank":
+                st.markdown("This puzzle's optimal tour was precomputed offline; "
+                            "the algorithms are being compared in the background.")
+            else:
+                st.markdown("The optimal tour was solved while you picked cities; "
+                            "the algorithms are being compared in the background.")
+            st.button("🔄 Refresh Comparison")
         for res in algo_outputs:
             algo_name = res['algorithm']
+            if res['timed_out']:
+                st.markdown(f"**{algo_name}**: timed out after `{res['time']}` seconds")
+                continue
             cost = res['cost']
             t = res['time']
             path = [city_names[i] for i in res['path']]
             st.markdown(f"**{algo_name}**: `{ ' -> '.join(str(x) for x in path) }` = {str(cost)} units in `{str(t)}` seconds")
+            if 'peak_memory' in res:
+                st.caption(f"CPU `{res['cpu_time']:.4f}` s, peak memory `{res['peak_memory'] / 1024:.1f}` KiB")
+            if res['counters']:
+                st.caption(", ".join(f"{name.replace('_', ' ')}: {value:,}" for name, value in res['counters'].items()))
+        for skipped in dispatch['skipped']:
+            st.markdown(f"**{skipped['algorithm']}**: skipped ({skipped['reason']})")
 
     st.markdown("---")
     st.markdown("Want to try again or check the leaderboard?")
@@ -446,6 +629,13 @@ elif st.session_state.page == "evaluate_path":
 
 # --- Page: Algorithm Performance ---
 elif st.session_state.page == "algorithm_performance":
+    import pandas as pd
+    import plotly.express as px
+    from database import get_db
+    from storage import DESCENDING
+
+    db = get_db()
+
     st.title("📊 Algorithm Performance")
 
     st.markdown("""
@@ -458,24 +648,33 @@ elif st.session_state.page == "algorithm_performance":
         game_results = db.query(
             "tsp_game_results",
             order_by="timestamp",
-            direction=firestore.Query.DESCENDING,
+            direction=DESCENDING,
             limit=10
         )
         # Extract game IDs (already sorted by timestamp descending)
         game_ids = [game["id"] for game in game_results]
 
-        # Fetch algorithm performances for these games
+        # Games saved with denormalized timings need no second query;
+        # older ones, and games compared after saving, are fetched together in bulk
+        missing_ids = [game["id"] for game in game_results if not game.get("algorithm_performance")]
+        performance = db.get_algorithm_performance(missing_ids)
+        for game in game_results:
+            if game.get("algorithm_performance"):
+                performance[game["id"]] = game["algorithm_performance"]
+
+        # Games whose comparison never finished have no timings to show
+        game_ids = [game_id for game_id in game_ids if performance.get(game_id)]
+
         data = []
         for i, game_id in enumerate(game_ids):
-            perf_docs = db.query(
-                "tsp_algorithm_performance",
-                filters=[("game_id", "==", game_id)]
-            )
-            for perf in perf_docs:
+            for perf in performance.get(game_id, []):
                 data.append({
                     "Game Round": len(game_ids) - i,  # Most recent game gets highest number
                     "algorithm_name": perf["algorithm_name"],
-                    "execution_time": perf["execution_time"]
+                    "execution_time": perf["execution_time"],
+                    "cpu_time": perf.get("cpu_time"),
+                    "peak_memory_kib": perf["peak_memory"] / 1024 if perf.get("peak_memory") is not None else None,
+                    **(perf.get("counters") or {})
                 })
 
         if data:
@@ -498,6 +697,30 @@ elif st.session_state.page == "algorithm_performance":
             )
             st.plotly_chart(fig)
 
+            # Instrumented games also record CPU time, peak memory and search counters
+            for column, title, label in [
+                ("cpu_time", "Algorithm CPU Times", "CPU time (seconds)"),
+                ("peak_memory_kib", "Algorithm Peak Memory", "Peak memory (KiB)"),
+            ]:
+                measured = df.dropna(subset=[column])
+                if not measured.empty:
+                    st.plotly_chart(px.bar(
+                        measured,
+                        x="Game Round",
+                        y=column,
+                        color="algorithm_name",
+                        title=title,
+                        labels={"Game Round": "Game Round", column: label, "algorithm_name": "Algorithm"},
+                        barmode="group"
+                    ))
+
+            counter_columns = [c for c in df.columns if c not in (
+                "Game Round", "algorithm_name", "execution_time", "cpu_time", "peak_memory_kib"
+            )]
+            if counter_columns:
+                st.subheader("Search Counters")
+                st.dataframe(df.dropna(how="all", subset=counter_columns)[["Game Round", "algorithm_name"] + counter_columns])
+
             # Display pivot table
             st.subheader("Performance by Game Round")
             st.dataframe(pivot_df)
@@ -508,6 +731,11 @@ elif st.session_state.page == "algorithm_performance":
         
 # --- Page: Leaderboard ---
 elif st.session_state.page == "leaderboard":
+    import pandas as pd
+    from database import get_db
+
+    db = get_db()
+
     st.title("🏆 Leaderboard")
 
     st.markdown("""
@@ -515,26 +743,12 @@ elif st.session_state.page == "leaderboard":
     """)
 
     try:
-        # Fetch all optimal game results
-        optimal_games = db.query(
-            "tsp_game_results",
-            filters=[("is_optimal", "==", True)]
-        )
-        if optimal_games:
-            # Create DataFrame
-            df = pd.DataFrame(optimal_games)
-            # Filter out invalid player names
-            df = df[df['player_name'].notnull() & (df['player_name'] != '')]
-            # Aggregate data
-            leaderboard = df.groupby('player_name').agg(
-                optimal_count=('player_name', 'count'),
-                best_distance=('user_distance', 'min'),
-                last_played=('timestamp', 'max')
-            ).reset_index()
-            # Sort and limit to top 10
-            leaderboard = leaderboard.sort_values(
-                by=['optimal_count', 'best_distance'], ascending=[False, True]
-            ).head(10)
+        # Top 10 straight from the per-player aggregates
+        top_players = db.top_players(limit=10)
+        if top_players:
+            leaderboard = pd.DataFrame(top_players)[
+                ['player_name', 'optimal_count', 'best_distance', 'last_played']
+            ]
             # Set index to start at 1
             leaderboard.index = leaderboard.index + 1
 
@@ -0,0 +1,222 @@
+"""
+Reproducible benchmark for the solvers in tsp_algorithms.
+
+Generates seeded symmetric, asymmetric and Euclidean instances, runs every
+registered solver with warmup and repeats, and records wall time, peak
+traced memory and the optimality gap against an exact solver. Results go to
+JSON and/or CSV; with --baseline the run fails when a solver got slower or
+worse than the saved baseline, and --plot draws the scaling curves.
+
+    python benchmark.py --sizes 6 8 10 12 --json bench.json --baseline bench_baseline.json
+    python benchmark.py --sizes 6 8 10 12 --baseline bench_baseline.json --save-baseline
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from tsp_algorithms import ALGORITHMS, estimate_runtime, held_karp_numpy_tsp
+
+INSTANCE_KINDS = ['symmetric', 'asymmetric', 'euclidean']
+
+# Largest instance the gap reference (NumPy Held-Karp) is asked to solve
+MAX_EXACT_SIZE = 16
+
+# Timings below this are treated as noise when comparing with a baseline
+MIN_COMPARABLE_TIME = 0.001
+
+def generate_instance(kind, n, seed):
+    """
+    Builds a seeded ``n x n`` distance matrix of the given kind.
+    """
+    rng = random.Random(f"{seed}-{kind}-{n}")
+    if kind == 'symmetric':
+        matrix = [[0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1, n):
+                matrix[i][j] = matrix[j][i] = rng.randint(1, 100)
+        return matrix
+    if kind == 'asymmetric':
+        return [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+    if kind == 'euclidean':
+        points = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(n)]
+        return [[math.dist(a, b) for b in points] for a in points]
+    raise ValueError(f"Unknown instance kind: {kind}")
+
+def measure(func, dist_matrix, home_index=0, warmup=1, repeats=3):
+    """
+    Times ``func`` over ``repeats`` runs after ``warmup`` runs, then makes
+    one extra run under tracemalloc for peak memory.
+    """
+    for _ in range(warmup):
+        func(dist_matrix, home_index)
+
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(dist_matrix, home_index)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func(dist_matrix, home_index)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, times, peak
+
+def run_benchmark(sizes, kinds=None, algorithms=None, seed=0, warmup=1, repeats=3, max_estimate=5.0):
+    """
+    Benchmarks ``algorithms`` (all registered solvers by default) on every
+    kind and size. Solvers whose estimated runtime exceeds ``max_estimate``
+    seconds are skipped. Returns one record per (kind, size, algorithm).
+    """
+    kinds = kinds or INSTANCE_KINDS
+    algorithms = algorithms or list(ALGORITHMS)
+    records = []
+
+    for kind in kinds:
+        for n in sizes:
+            dist_matrix = generate_instance(kind, n, seed)
+            optimum = held_karp_numpy_tsp(dist_matrix, 0)['cost'] if n <= MAX_EXACT_SIZE else None
+
+            for name in algorithms:
+                estimate = estimate_runtime(name, n)
+                if estimate > max_estimate:
+                    print(f"skip {name} on {kind} n={n}: estimated {estimate:.3g}s")
+                    continue
+
+                result, times, peak = measure(ALGORITHMS[name], dist_matrix, warmup=warmup, repeats=repeats)
+                gap = None
+                if optimum:
+                    gap = result['cost'] / optimum - 1
+                records.append({
+                    'kind': kind,
+                    'n': n,
+                    'algorithm': name,
+                    'time_median': statistics.median(times),
+                    'time_min': min(times),
+                    'peak_memory_bytes': peak,
+                    'cost': result['cost'],
+                    'optimum': optimum,
+                    'gap': gap
+                })
+                print(f"{kind:>10} n={n:<4} {name:<32} {statistics.median(times):.6f}s "
+                      f"{peak / 1024:.0f} KiB gap={'-' if gap is None else f'{gap:.4f}'}")
+
+    return records
+
+def compare_to_baseline(records, baseline, tolerance=0.25, gap_tolerance=1e-9):
+    """
+    Lists regressions of ``records`` against ``baseline`` records: median
+    time more than ``tolerance`` slower (ignoring sub-millisecond noise) or
+    a larger optimality gap.
+    """
+    previous = {(r['kind'], r['n'], r['algorithm']): r for r in baseline}
+    regressions = []
+
+    for record in records:
+        old = previous.get((record['kind'], record['n'], record['algorithm']))
+        if old is None:
+            continue
+        label = f"{record['algorithm']} on {record['kind']} n={record['n']}"
+        if (record['time_median'] > MIN_COMPARABLE_TIME
+                and record['time_median'] > old['time_median'] * (1 + tolerance)):
+            regressions.append(
+                f"{label}: {record['time_median']:.6f}s vs baseline {old['time_median']:.6f}s"
+            )
+        if record['gap'] is not None and old['gap'] is not None and record['gap'] > old['gap'] + gap_tolerance:
+            regressions.append(f"{label}: gap {record['gap']:.4f} vs baseline {old['gap']:.4f}")
+
+    return regressions
+
+def write_json(records, path):
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=2)
+
+def write_csv(records, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]) if records else ['kind'])
+        writer.writeheader()
+        writer.writerows(records)
+
+def plot_scaling(records, path):
+    """
+    Saves log-scale time-vs-size curves, one panel per instance kind.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    kinds = list(dict.fromkeys(r['kind'] for r in records))
+    fig, axes = plt.subplots(1, len(kinds), figsize=(6 * len(kinds), 4), squeeze=False)
+    for ax, kind in zip(axes[0], kinds):
+        for name in dict.fromkeys(r['algorithm'] for r in records):
+            points = sorted((r['n'], r['time_median']) for r in records
+                            if r['kind'] == kind and r['algorithm'] == name)
+            if points:
+                ax.plot(*zip(*points), marker='o', label=name)
+        ax.set_yscale('log')
+        ax.set_title(kind)
+        ax.set_xlabel("Cities")
+        ax.set_ylabel("Median time (s)")
+    axes[0][-1].legend(fontsize='small')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the TSP solvers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 8, 10, 12, 15])
+    parser.add_argument('--kinds', nargs='+', choices=INSTANCE_KINDS, default=INSTANCE_KINDS)
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-estimate', type=float, default=5.0,
+                        help="skip solvers estimated to take longer than this many seconds")
+    parser.add_argument('--json', help="write results to this JSON file")
+    parser.add_argument('--csv', help="write results to this CSV file")
+    parser.add_argument('--plot', help="save scaling curves to this image file")
+    parser.add_argument('--baseline', help="fail on regressions against this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed fractional slowdown against the baseline")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="write the results to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    records = run_benchmark(
+        args.sizes, args.kinds, args.algorithms, args.seed, args.warmup, args.repeats, args.max_estimate
+    )
+
+    if args.json:
+        write_json(records, args.json)
+    if args.csv:
+        write_csv(records, args.csv)
+    if args.plot:
+        plot_scaling(records, args.plot)
+
+    if args.baseline:
+        if args.save_baseline:
+            write_json(records, args.baseline)
+            print(f"Baseline saved to {args.baseline}")
+            return 0
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(records, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,88 +1,474 @@
-import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from storage import DESCENDING, StorageBackend, SQLiteDatabase, performance_record
 
-firebase_config = dict(st.secrets["firebase"])
-firebase_config["private_key"] = firebase_config["private_key"].replace("\\n", "\n")
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
 
+class QueryCache:
+    """
+    Process-wide read-through cache for ``FirebaseDatabase.query`` results.
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate(firebase_config)
-    firebase_admin.initialize_app(cred)
+    Entries are keyed by collection, filters, ordering and limit, expire
+    after ``ttl`` seconds and are evicted least-recently-used beyond
+    ``max_entries``. Writes invalidate every entry of the collections
+    they touch.
+    """
 
-firestore_db = firestore.client()
+    def __init__(self, max_entries=256, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
-class FirebaseDatabase:
+    @staticmethod
+    def make_key(collection_name, filters, order_by, direction, limit):
+        def freeze(value):
+            if isinstance(value, (list, tuple)):
+                return tuple(freeze(v) for v in value)
+            return value
+        return (collection_name, freeze(filters or ()), freeze(order_by), direction, limit)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *collection_names):
+        with self._lock:
+            stale = [key for key in self._entries if key[0] in collection_names]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+query_cache = QueryCache()
+
+def _already_exists(error):
+    from google.api_core.exceptions import AlreadyExists
+    return isinstance(error, AlreadyExists)
+
+class FirestoreWriteQueue:
+    """
+    Write-behind queue that commits Firestore writes on a background thread.
+
+    Each submitted group of ``(doc_ref, data, mode)`` writes, where ``mode``
+    is "set", "merge" or "create", is committed in one batch together with
+    any other groups already waiting. A group whose "create" target already
+    exists is dropped as a duplicate without affecting the others. At most
+    ``max_pending`` groups are held in memory; when the queue is full the
+    caller commits its own group instead of waiting. Failed commits are
+    retried with exponential backoff, and pending writes are flushed at
+    interpreter exit. ``on_commit`` is called with each committed list of
+    writes.
+    """
+
+    def __init__(self, firestore_db, max_pending=1000, max_retries=5, base_delay=0.5, on_commit=None):
+        self.db = firestore_db
+        self.on_commit = on_commit
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="firestore-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, writes):
+        if not writes:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(list(writes))
+        except queue.Full:
+            print("\u274C Write queue full, committing synchronously")
+            self._commit_groups([writes])
+
+    def _commit(self, writes):
+        for attempt in range(self.max_retries + 1):
+            try:
+                for start in range(0, len(writes), MAX_BATCH_WRITES):
+                    batch = self.db.batch()
+                    for doc_ref, data, mode in writes[start:start + MAX_BATCH_WRITES]:
+                        if mode == "create":
+                            batch.create(doc_ref, data)
+                        else:
+                            batch.set(doc_ref, data, merge=mode == "merge")
+                    batch.commit()
+                if self.on_commit:
+                    self.on_commit(writes)
+                return True
+            except Exception as e:
+                if _already_exists(e):
+                    raise
+                if attempt == self.max_retries:
+                    print(f"\u274C Failed to commit {len(writes)} writes: {e}")
+                    return False
+                time.sleep(self.base_delay * 2 ** attempt)
+
+    def _commit_groups(self, groups):
+        try:
+            self._commit([write for group in groups for write in group])
+        except Exception as e:
+            if not _already_exists(e):
+                raise
+            # Some group was already written; commit the others on their own
+            for group in groups:
+                try:
+                    self._commit(group)
+                except Exception as e:
+                    if not _already_exists(e):
+                        raise
+                    print("\u2705 Duplicate write skipped")
+
+    def _run(self):
+        while True:
+            group = self._queue.get()
+            if group is None:
+                self._queue.task_done()
+                return
+            groups = [group]
+            writes = list(group)
+            stop = False
+            # Fold whatever else is already waiting into the same batch
+            while len(writes) < MAX_BATCH_WRITES:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    groups.append(extra)
+                    break
+                groups.append(extra)
+                writes.extend(extra)
+            self._commit_groups([g for g in groups if g is not None])
+            for _ in groups:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """
+        Blocks until every submitted write has been committed or dropped.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+def create_firestore_client():
+    # Imported here so that SQLite runs and pages without a database never
+    # load Streamlit secrets, firebase_admin or the gRPC stack
+    import streamlit as st
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    firebase_config = dict(st.secrets["firebase"])
+    firebase_config["private_key"] = firebase_config["private_key"].replace("\\n", "\n")
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(firebase_config)
+        firebase_admin.initialize_app(cred)
+
+    return firestore.client()
+
+class FirebaseDatabase(StorageBackend):
     def __init__(self, firestore_db):
+        from firebase_admin import firestore
         self.db = firestore_db
+        self.firestore = firestore
+        self.write_queue = FirestoreWriteQueue(firestore_db, on_commit=self._invalidate_written)
         print("\u2705 Firebase connection established")
     
+    def _invalidate_written(self, writes):
+        query_cache.invalidate(*{doc_ref.parent.id for doc_ref, _, _ in writes})
+
     def initialize_db(self):
         # Firestore is schemaless, so no need to pre-create tables/collections
         print("\u2705 No schema setup required for Firestore")
 
     def save_game_result(
         self, player_name, home_city, selected_cities, user_path,
-        user_distance, is_optimal, best_path, best_distance  # Removed is_correct
+        user_distance, is_optimal, best_path, best_distance,  # Removed is_correct
+        idempotency_key=None
     ):
         if not player_name or not isinstance(player_name, str):
             print("Invalid player name")
             return None
 
         try:
-            game_data = {
-                "player_name": player_name.strip(),
-                "home_city": home_city,
-                "selected_cities": list(selected_cities) if selected_cities else [],
-                "user_path": user_path,
-                "user_distance": user_distance,
-                "is_optimal": is_optimal,  # Now correctly used
-                "best_path": best_path,
-                "best_distance": best_distance,
-                "timestamp": firestore.SERVER_TIMESTAMP
-            }
+            game_data = self._game_data(
+                player_name, home_city, selected_cities, user_path,
+                user_distance, is_optimal, best_path, best_distance
+            )
             # Correctly create a new document reference and set data
-            doc_ref = self.db.collection("tsp_game_results").document()
-            doc_ref.set(game_data)
+            doc_ref = self.db.collection("tsp_game_results").document(idempotency_key)
+            # The game and the player's leaderboard aggregate are committed
+            # atomically; with an idempotency key a repeat fails as a whole
+            batch = self.db.batch()
+            if idempotency_key:
+                batch.create(doc_ref, game_data)
+            else:
+                batch.set(doc_ref, game_data)
+            for stats_ref, stats_data, mode in self._player_stats_writes(player_name, user_distance, is_optimal):
+                batch.set(stats_ref, stats_data, merge=mode == "merge")
+            try:
+                batch.commit()
+            except Exception as e:
+                if not (idempotency_key and _already_exists(e)):
+                    raise
+                print("\u2705 Game result already saved")
+                return doc_ref.id
+            query_cache.invalidate("tsp_game_results", "tsp_player_stats")
             print("\u2705 Game result saved")
             return doc_ref.id  # Return the document ID
         except Exception as e:
             print(f"\u274C Failed to save game result: {e}")
             return None
 
+    def _game_data(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance
+    ):
+        return {
+            "player_name": player_name.strip(),
+            "home_city": home_city,
+            "selected_cities": list(selected_cities) if selected_cities else [],
+            "user_path": user_path,
+            "user_distance": user_distance,
+            "is_optimal": is_optimal,  # Now correctly used
+            "best_path": best_path,
+            "best_distance": best_distance,
+            "timestamp": self.firestore.SERVER_TIMESTAMP
+        }
+
+    def _performance_writes(self, game_id, algorithm_data):
+        return [
+            (self.db.collection("tsp_algorithm_performance").document(), {
+                "game_id": game_id,
+                **performance_record(entry),
+                "timestamp": self.firestore.SERVER_TIMESTAMP
+            }, "set")
+            for entry in algorithm_data
+        ]
+
+    def _player_stats_writes(self, player_name, user_distance, is_optimal):
+        """
+        Leaderboard aggregate update for one game. Only optimal games count,
+        and server-side transforms make the update safe without a read.
+        """
+        if not is_optimal:
+            return []
+        player_name = player_name.strip()
+        return [(self.db.collection("tsp_player_stats").document(player_name), {
+            "player_name": player_name,
+            "optimal_count": self.firestore.Increment(1),
+            "best_distance": self.firestore.Minimum(user_distance),
+            "last_played": self.firestore.SERVER_TIMESTAMP
+        }, "merge")]
+
     def save_algorithm_performance(self, game_id, algorithm_data):
         if not game_id:
             print("\u274C Invalid game_id")
             return
 
         try:
-            for algo_name, exec_time in algorithm_data:
-                self.db.collection("tsp_algorithm_performance").add({
-                    "game_id": game_id,
-                    "algorithm_name": algo_name,
-                    "execution_time": exec_time,
-                    "timestamp": firestore.SERVER_TIMESTAMP
-                })
+            batch = self.db.batch()
+            for doc_ref, data, mode in self._performance_writes(game_id, algorithm_data):
+                batch.set(doc_ref, data, merge=mode == "merge")
+            batch.commit()
+            query_cache.invalidate("tsp_algorithm_performance")
             print("\u2705 Algorithm performance saved")
         except Exception as e:
             print(f"\u274C Failed to save algorithm performance: {e}")
 
-    def query(self, collection_name, filters=None, order_by=None, direction=firestore.Query.DESCENDING, limit=None):
+    def queue_game_result(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, algorithm_data,
+        idempotency_key=None
+    ):
+        """
+        Queues a game result and its algorithm timings for one batched,
+        background commit. The game ID is allocated client-side and
+        returned immediately. With an ``idempotency_key`` the key becomes
+        the game ID and repeats of the same game are dropped server-side.
+        """
+        if not player_name or not isinstance(player_name, str):
+            print("Invalid player name")
+            return None
+
+        try:
+            game_ref = self.db.collection("tsp_game_results").document(idempotency_key)
+            game_data = self._game_data(
+                player_name, home_city, selected_cities, user_path,
+                user_distance, is_optimal, best_path, best_distance
+            )
+            # Denormalized copy so the performance page can skip the join
+            game_data["algorithm_performance"] = [performance_record(entry) for entry in algorithm_data]
+            writes = [(game_ref, game_data, "create" if idempotency_key else "set")]
+            writes.extend(self._player_stats_writes(player_name, user_distance, is_optimal))
+            writes.extend(self._performance_writes(game_ref.id, algorithm_data))
+            self.write_queue.submit(writes)
+            self._invalidate_written(writes)
+            print("\u2705 Game result queued")
+            return game_ref.id
+        except Exception as e:
+            print(f"\u274C Failed to queue game result: {e}")
+            return None
+
+    def query(self, collection_name, filters=None, order_by=None, direction=DESCENDING, limit=None,
+              use_cache=True):
+        # order_by is a field name, or a list of (field, direction) pairs
+        key = QueryCache.make_key(collection_name, filters, order_by, direction, limit)
+        if use_cache:
+            cached = query_cache.get(key)
+            if cached is not None:
+                return cached
         try:
             collection_ref = self.db.collection(collection_name)
             if filters:
                 for field, op, value in filters:
                     collection_ref = collection_ref.where(field, op, value)
-            if order_by:
+            if isinstance(order_by, (list, tuple)):
+                for field, field_direction in order_by:
+                    collection_ref = collection_ref.order_by(field, direction=field_direction)
+            elif order_by:
                 collection_ref = collection_ref.order_by(order_by, direction=direction)
             if limit:
                 collection_ref = collection_ref.limit(limit)
             docs = collection_ref.stream()
-            return [{"id": doc.id, **doc.to_dict()} for doc in docs]
+            results = [{"id": doc.id, **doc.to_dict()} for doc in docs]
+            if use_cache:
+                query_cache.put(key, results)
+            return results
         except Exception as e:
             print(f"\u274C Failed to execute query: {e}")
             return []
 
-# Initialize database connection
-db = FirebaseDatabase(firestore_db)
-db.initialize_db()
\ No newline at end of file
+    def get_algorithm_performance(self, game_ids):
+        """
+        Fetches performance documents for many games at once.
+
+        IDs are split into chunks that fit one "in" query and the chunks
+        are queried concurrently. Returns ``{game_id: [perf_doc, ...]}``.
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        performance = {game_id: [] for game_id in game_ids}
+        chunks = [game_ids[i:i + self.max_in_values] for i in range(0, len(game_ids), self.max_in_values)]
+        if not chunks:
+            return performance
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as executor:
+            results = executor.map(
+                lambda chunk: self.query("tsp_algorithm_performance", filters=[("game_id", "in", chunk)]),
+                chunks
+            )
+            for docs in results:
+                for doc in docs:
+                    performance.setdefault(doc["game_id"], []).append(doc)
+        return performance
+
+    def rebuild_player_stats(self):
+        """
+        One-off backfill of tsp_player_stats from the full game history.
+        """
+        try:
+            stats = {}
+            for game in self.query("tsp_game_results", filters=[("is_optimal", "==", True)], use_cache=False):
+                name = (game.get("player_name") or "").strip()
+                if not name:
+                    continue
+                entry = stats.setdefault(name, {
+                    "player_name": name,
+                    "optimal_count": 0,
+                    "best_distance": game["user_distance"],
+                    "last_played": game.get("timestamp")
+                })
+                entry["optimal_count"] += 1
+                entry["best_distance"] = min(entry["best_distance"], game["user_distance"])
+                if game.get("timestamp") and (entry["last_played"] is None or game["timestamp"] > entry["last_played"]):
+                    entry["last_played"] = game["timestamp"]
+
+            names = list(stats)
+            for start in range(0, len(names), MAX_BATCH_WRITES):
+                batch = self.db.batch()
+                for name in names[start:start + MAX_BATCH_WRITES]:
+                    batch.set(self.db.collection("tsp_player_stats").document(name), stats[name])
+                batch.commit()
+            query_cache.invalidate("tsp_player_stats")
+            print(f"\u2705 Rebuilt leaderboard stats for {len(names)} players")
+        except Exception as e:
+            print(f"\u274C Failed to rebuild player stats: {e}")
+
+def create_database(backend=None):
+    """
+    Builds the storage backend named by ``backend`` or the
+    TSP_STORAGE_BACKEND environment variable: "firestore" (default) or
+    "sqlite", which stores data in TSP_SQLITE_PATH.
+    """
+    backend = backend or os.environ.get("TSP_STORAGE_BACKEND", "firestore")
+    if backend == "sqlite":
+        return SQLiteDatabase(os.environ.get("TSP_SQLITE_PATH", "tsp.sqlite3"))
+    if backend == "firestore":
+        return FirebaseDatabase(create_firestore_client())
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+_db = None
+_db_lock = threading.Lock()
+
+def get_db():
+    """
+    Returns the shared database, connecting on first use.
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = create_database()
+            _db.initialize_db()
+    return _db
+
+def __getattr__(name):
+    # Keeps `from database import db` working without connecting at import
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
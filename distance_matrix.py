@@ -0,0 +1,127 @@
+import numpy as np
+
+class DistanceMatrix:
+    """
+    Compact distance matrix shared by the TSP solvers.
+
+    Distances live in one contiguous NumPy buffer: either the full
+    ``n x n`` matrix or, for symmetric instances with a zero diagonal, the
+    condensed upper triangle (``n * (n - 1) / 2`` values). Integer
+    distances are stored as integers so solver costs stay exact.
+    """
+
+    __slots__ = ('n', 'condensed', '_data')
+
+    def __init__(self, values, condensed=False):
+        full = np.asarray(values)
+        if full.dtype.kind not in 'iuf':
+            full = full.astype(np.float64)
+        elif full.dtype.kind in 'iu':
+            full = full.astype(np.int64)
+        if full.ndim != 2 or full.shape[0] != full.shape[1]:
+            raise ValueError(f"Distance matrix must be square, got shape {full.shape}")
+
+        self.n = full.shape[0]
+        self.condensed = condensed
+        if condensed:
+            if not (np.array_equal(full, full.T) and not full.diagonal().any()):
+                raise ValueError("Only symmetric matrices with a zero diagonal can be condensed")
+            self._data = np.ascontiguousarray(full[np.triu_indices(self.n, k=1)])
+        else:
+            self._data = np.ascontiguousarray(full)
+
+    @classmethod
+    def from_pairs(cls, cities, distances, condensed=None):
+        """
+        Builds a matrix from a ``{(city1, city2): distance}`` dict.
+
+        ``cities`` fixes the index order. Missing pairs fall back to the
+        reverse pair, then to 0. ``condensed=None`` condenses whenever the
+        result is symmetric.
+        """
+        index = {city: i for i, city in enumerate(cities)}
+        n = len(cities)
+        pairs = [(index[a], index[b], d) for (a, b), d in distances.items() if a in index and b in index]
+        values = [d for _, _, d in pairs]
+        dtype = np.int64 if all(isinstance(d, (int, np.integer)) for d in values) else np.float64
+
+        full = np.zeros((n, n), dtype=dtype)
+        if pairs:
+            rows, cols, _ = zip(*pairs)
+            full[cols, rows] = values
+            full[rows, cols] = values
+        np.fill_diagonal(full, 0)
+
+        if condensed is None:
+            condensed = bool(np.array_equal(full, full.T))
+        return cls(full, condensed=condensed)
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self.n))
+
+    def _condensed_index(self, i, j):
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        return self.n * i - i * (i + 1) // 2 + (j - i - 1)
+
+    def row(self, i):
+        """
+        Distances from city ``i`` to every city, as a NumPy array.
+        """
+        if not self.condensed:
+            return self._data[i]
+        cols = np.arange(self.n)
+        out = np.zeros(self.n, dtype=self._data.dtype)
+        others = cols != i
+        out[others] = self._data[self._condensed_index(i, cols[others])]
+        return out
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            if not self.condensed:
+                return self._data[i, j].item()
+            return 0 if i == j else self._data[self._condensed_index(i, j)].item()
+        return self.row(key)
+
+    def __array__(self, dtype=None, copy=None):
+        if self.condensed:
+            full = np.zeros((self.n, self.n), dtype=self._data.dtype)
+            iu = np.triu_indices(self.n, k=1)
+            full[iu] = self._data
+            full[iu[::-1]] = self._data
+        else:
+            full = self._data.copy() if copy else self._data
+        return full if dtype is None else full.astype(dtype, copy=False)
+
+    def tolist(self):
+        """
+        Plain list-of-lists copy for solvers with Python inner loops.
+        """
+        return np.asarray(self).tolist()
+
+    def path_cost(self, path):
+        """
+        Total cost of following ``path`` edge by edge.
+        """
+        if len(path) < 2:
+            return 0
+        path = np.asarray(path, dtype=np.intp)
+        a, b = path[:-1], path[1:]
+        if self.condensed:
+            same = a == b
+            costs = np.zeros(len(a), dtype=self._data.dtype)
+            costs[~same] = self._data[self._condensed_index(a[~same], b[~same])]
+        else:
+            costs = self._data[a, b]
+        return costs.sum().item()
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
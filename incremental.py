@@ -0,0 +1,184 @@
+"""
+Incremental re-solving for instances that gain or lose one city at a time.
+"""
+import numpy as np
+
+from tsp_algorithms import improve_tour, tour_cost
+
+# Largest selection (excluding home) whose Held-Karp table is kept
+EXACT_LIMIT = 16
+
+class IncrementalSolver:
+    """
+    Keeps the best tour from ``home_index`` through a changing selection of
+    the cities of ``dist_matrix``.
+
+    While at most ``exact_limit`` cities are selected, the Held-Karp table
+    over the selection is kept: inserting a city only computes the subsets
+    that contain it, and removing one keeps the subsets that did not, so
+    nothing is recomputed. Larger selections are solved heuristically by
+    cheapest insertion or splicing out, followed by ``improve_tour`` repair
+    for up to ``time_limit`` seconds.
+    """
+
+    def __init__(self, dist_matrix, home_index, cities=(), exact_limit=EXACT_LIMIT, time_limit=0.5):
+        self.dist_matrix = dist_matrix
+        self.d = np.asarray(dist_matrix, dtype=np.float64)
+        self.home_index = home_index
+        self.exact_limit = exact_limit
+        self.time_limit = time_limit
+
+        self.cities = []
+        self.tour = [home_index, home_index]
+        self.cost = 0
+        self.states_expanded = 0
+        self._cost_table = np.zeros((1, 0))
+        self._parent = np.zeros((1, 0), dtype=np.int8)
+
+        for city in cities:
+            self.insert(city)
+
+    @property
+    def exact(self):
+        return self._cost_table is not None
+
+    def result(self):
+        """
+        The current tour as ``{'path', 'cost', 'exact', 'counters'}``.
+        """
+        return {
+            'path': list(self.tour),
+            'cost': self.cost,
+            'exact': self.exact,
+            'counters': {'states_expanded': self.states_expanded}
+        }
+
+    def insert(self, city):
+        if city == self.home_index or city in self.cities:
+            return self.result()
+        self.cities.append(city)
+
+        if self.exact and len(self.cities) <= self.exact_limit:
+            self._extend_table()
+            self._tour_from_table()
+        elif self.exact:
+            self._cost_table = self._parent = None
+            self._insert_cheapest(city)
+        else:
+            self._insert_cheapest(city)
+        return self.result()
+
+    def remove(self, city):
+        if city not in self.cities:
+            return self.result()
+        bit = self.cities.index(city)
+        self.cities.remove(city)
+
+        if self.exact:
+            self._drop_from_table(bit)
+            self._tour_from_table()
+        elif len(self.cities) <= self.exact_limit:
+            # Back within reach of the exact table; rebuild it once
+            cities = self.cities
+            self.cities = []
+            self._cost_table = np.zeros((1, 0))
+            self._parent = np.zeros((1, 0), dtype=np.int8)
+            for c in cities:
+                self.cities.append(c)
+                self._extend_table()
+            self._tour_from_table()
+        else:
+            self.tour.remove(city)
+            self._repair()
+        return self.result()
+
+    def _extend_table(self):
+        """
+        Grows the table by the newest city, computing only the subsets
+        that contain it; the others are unchanged.
+        """
+        k = len(self.cities)
+        bit = k - 1
+        cost = np.full((1 << k, k), np.inf)
+        parent = np.full((1 << k, k), -1, dtype=np.int8)
+        cost[:1 << bit, :bit] = self._cost_table
+        parent[:1 << bit, :bit] = self._parent
+
+        w = self.d[np.ix_(self.cities, self.cities)]
+        cost[1 << bit, bit] = self.d[self.home_index, self.cities[bit]]
+
+        masks = np.arange(1 << bit, 1 << k)
+        popcount = np.zeros(len(masks), dtype=np.int8)
+        for j in range(k):
+            popcount += (masks >> j) & 1
+
+        states = 1
+        for size in range(2, k + 1):
+            layer = masks[popcount == size]
+            for j in range(k):
+                sel = layer[(layer >> j) & 1 == 1]
+                cand = cost[sel ^ (1 << j)] + w[:, j]
+                best = np.argmin(cand, axis=1)
+                cost[sel, j] = cand[np.arange(len(sel)), best]
+                parent[sel, j] = best
+                states += len(sel)
+
+        self.states_expanded = states
+        self._cost_table = cost
+        self._parent = parent
+
+    def _drop_from_table(self, bit):
+        """
+        Shrinks the table by one city: the subsets without it are exactly
+        the new table, in the same order.
+        """
+        masks = np.arange(len(self._cost_table))
+        keep = masks[(masks >> bit) & 1 == 0]
+        columns = [j for j in range(self._cost_table.shape[1]) if j != bit]
+        self._cost_table = self._cost_table[np.ix_(keep, columns)]
+        parent = self._parent[np.ix_(keep, columns)]
+        parent[parent > bit] -= 1
+        self._parent = parent
+        self.states_expanded = 0
+
+    def _tour_from_table(self):
+        k = len(self.cities)
+        if k == 0:
+            self.tour = [self.home_index, self.home_index]
+            self.cost = 0
+            return
+
+        full = (1 << k) - 1
+        totals = self._cost_table[full] + self.d[self.cities, self.home_index]
+        j = int(np.argmin(totals))
+        path = []
+        mask = full
+        for _ in range(k):
+            path.append(self.cities[j])
+            prev = int(self._parent[mask, j])
+            mask &= ~(1 << j)
+            j = prev
+
+        path.reverse()
+        self.tour = [self.home_index] + path + [self.home_index]
+        self.cost = tour_cost(self.dist_matrix, self.tour)
+
+    def _insert_cheapest(self, city):
+        a = np.asarray(self.tour[:-1])
+        b = np.asarray(self.tour[1:])
+        added = self.d[a, city] + self.d[city, b] - self.d[a, b]
+        at = int(np.argmin(added)) + 1
+        self.tour.insert(at, city)
+        self._repair()
+
+    def _repair(self):
+        """
+        Local search on the selection's own submatrix, so ``improve_tour``
+        sees only the selected cities.
+        """
+        order = self.tour[:-1]
+        local = {city: i for i, city in enumerate(order)}
+        sub = self.d[np.ix_(order, order)]
+        improved = improve_tour(sub, [local[c] for c in self.tour], time_limit=self.time_limit)
+        self.tour = [order[i] for i in improved['path']]
+        self.cost = tour_cost(self.dist_matrix, self.tour)
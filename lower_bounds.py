@@ -0,0 +1,152 @@
+"""
+Lower bounds on the optimal tour cost, used to certify tours without an
+exact solver.
+"""
+import math
+
+import numpy as np
+
+from tsp_algorithms import minimum_spanning_tree, nearest_neighbor_tsp, tour_cost
+
+def _exact_small(d):
+    """
+    Optimal cost of instances with fewer than three cities.
+    """
+    n = len(d)
+    return float(d[0, 1] + d[1, 0]) if n == 2 else 0.0
+
+def _round_up(bound, d):
+    # Tours on integer matrices cost an integer, so the bound can be rounded up
+    if d.dtype.kind in 'iu':
+        return float(math.ceil(bound - 1e-6))
+    return bound
+
+def one_tree_bound(dist_matrix, upper_bound=None, iterations=100):
+    """
+    Held-Karp 1-tree bound improved by subgradient optimization.
+
+    A 1-tree is a spanning tree on every city but one plus that city's two
+    cheapest edges; every tour is a 1-tree. Node penalties ``pi`` are
+    adjusted towards degree two for up to ``iterations`` steps, with step
+    sizes scaled by the distance to ``upper_bound`` (the nearest-neighbor
+    tour cost by default). Asymmetric matrices use ``min(d[i][j], d[j][i])``.
+    """
+    d = np.asarray(dist_matrix)
+    n = len(d)
+    if n < 3:
+        return _exact_small(d)
+
+    w = d.astype(np.float64)
+    w = np.minimum(w, w.T)
+    if upper_bound is None:
+        upper_bound = nearest_neighbor_tsp(w, 0)['cost']
+
+    pi = np.zeros(n)
+    best = -math.inf
+    step_scale = 2.0
+    stalled = 0
+
+    for _ in range(iterations):
+        modified = w + pi[:, None] + pi[None, :]
+        degree = np.zeros(n, dtype=np.intp)
+        cost = 0.0
+        for a, b in minimum_spanning_tree(modified[1:, 1:]):
+            degree[a + 1] += 1
+            degree[b + 1] += 1
+            cost += modified[a + 1, b + 1]
+        nearest = np.argpartition(modified[0, 1:], 1)[:2] + 1
+        degree[nearest] += 1
+        degree[0] = 2
+        cost += modified[0, nearest].sum()
+
+        bound = cost - 2 * pi.sum()
+        if bound > best + 1e-9:
+            best = bound
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= 5:
+                step_scale /= 2
+                stalled = 0
+
+        subgradient = degree - 2
+        norm = subgradient @ subgradient
+        # A 1-tree with every degree two is a tour, so the bound is tight
+        if norm == 0 or step_scale < 1e-4 or best >= upper_bound - 1e-9:
+            break
+        pi += step_scale * (upper_bound - bound) / norm * subgradient
+
+    return _round_up(best, d)
+
+def assignment_bound(dist_matrix):
+    """
+    Assignment-problem bound: the cheapest way to give every city one
+    successor, ignoring subtours. Valid for asymmetric matrices. Solved
+    with the O(n^3) Hungarian algorithm.
+    """
+    d = np.asarray(dist_matrix)
+    n = len(d)
+    if n < 3:
+        return _exact_small(d)
+
+    cost = d.astype(np.float64)
+    # Forbid staying put without introducing infinities into the potentials
+    np.fill_diagonal(cost, cost.max() * n + 1)
+
+    # Shortest augmenting paths with potentials u (rows) and v (columns);
+    # column 0 is a virtual start and match[j] is the row given column j
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    match = np.zeros(n + 1, dtype=np.intp)
+    way = np.zeros(n + 1, dtype=np.intp)
+
+    for row in range(1, n + 1):
+        match[0] = row
+        col = 0
+        min_slack = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        while match[col] != 0:
+            used[col] = True
+            i = match[col]
+            free = ~used
+            free[0] = False
+            slack = cost[i - 1] - u[i] - v[1:]
+            closer = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][closer] = slack[closer]
+            way[1:][closer] = col
+            candidates = np.where(free, min_slack, np.inf)
+            nxt = int(np.argmin(candidates))
+            delta = candidates[nxt]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            col = nxt
+        while col:
+            prev = way[col]
+            match[col] = match[prev]
+            col = prev
+
+    total = cost[match[1:] - 1, np.arange(n)].sum()
+    return _round_up(float(total), d)
+
+def lower_bound(dist_matrix, upper_bound=None, iterations=100):
+    """
+    The stronger of the 1-tree and assignment bounds.
+    """
+    return max(one_tree_bound(dist_matrix, upper_bound, iterations), assignment_bound(dist_matrix))
+
+def optimality_gap(dist_matrix, path, bound=None):
+    """
+    How far the tour ``path`` can be from optimal.
+
+    Returns ``{'cost', 'lower_bound', 'gap', 'certified'}``, where ``gap``
+    is ``(cost - lower_bound) / lower_bound``. A tour whose gap is zero is
+    certified optimal. ``bound`` skips recomputing a known lower bound.
+    """
+    cost = tour_cost(dist_matrix, path)
+    if bound is None:
+        bound = lower_bound(dist_matrix, upper_bound=cost)
+    slack = max(cost - bound, 0)
+    certified = slack <= 1e-9 * max(abs(cost), 1)
+    gap = 0.0 if certified else (slack / bound if bound > 0 else math.inf)
+    return {'cost': cost, 'lower_bound': bound, 'gap': gap, 'certified': certified}
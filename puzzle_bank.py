@@ -0,0 +1,198 @@
+"""
+Offline bank of seeded game instances with their optimal tours.
+
+Each seed fixes the distances between every city of the game. For every
+home city and every selection of cities to visit, the bank stores the
+optimal tour, so a live game on a banked instance needs no solver work.
+
+    python puzzle_bank.py --seeds 20 --path puzzles.sqlite3
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+from incremental import EXACT_LIMIT, IncrementalSolver
+
+DEFAULT_CITIES = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J"]
+DEFAULT_PATH = os.environ.get('TSP_PUZZLE_BANK', 'puzzles.sqlite3')
+
+# Smallest selection a game accepts (see validate_city_selection in app.py)
+MIN_SELECTION = 3
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS instances ("
+    "seed INTEGER PRIMARY KEY, cities TEXT NOT NULL, distances BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS puzzles ("
+    "seed INTEGER NOT NULL, home TEXT NOT NULL, selected TEXT NOT NULL, size INTEGER NOT NULL, "
+    "best_path TEXT NOT NULL, best_distance INTEGER NOT NULL, "
+    "PRIMARY KEY (seed, home, selected)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_puzzles_size ON puzzles (size)",
+]
+
+def instance_distances(cities, seed):
+    """
+    Seeded ``{(city1, city2): distance}`` dict over every pair of ``cities``,
+    drawn like the live game's distances.
+    """
+    rng = random.Random(seed)
+    distances = {}
+    for i, city1 in enumerate(cities):
+        for j, city2 in enumerate(cities):
+            if i < j:
+                dist = rng.randint(50, 100)
+                distances[(city1, city2)] = dist
+                distances[(city2, city1)] = dist
+    return distances
+
+def _selection_key(selected):
+    return ",".join(sorted(selected))
+
+def _solve_home(cities, seed, home_index, sizes):
+    """
+    Solves every selection for one instance and home city. Selections are
+    visited in Gray-code order, so each step adds or removes one city and
+    the incremental solver reuses its Held-Karp table.
+    """
+    matrix = DistanceMatrix.from_pairs(cities, instance_distances(cities, seed))
+    others = [i for i in range(len(cities)) if i != home_index]
+    solver = IncrementalSolver(matrix, home_index)
+    rows = []
+
+    for step in range(1, 1 << len(others)):
+        city = others[(step & -step).bit_length() - 1]
+        if city in solver.cities:
+            solver.remove(city)
+        else:
+            solver.insert(city)
+        if len(solver.cities) in sizes:
+            result = solver.result()
+            rows.append((
+                seed,
+                cities[home_index],
+                _selection_key(cities[i] for i in solver.cities),
+                len(solver.cities),
+                ",".join(cities[i] for i in result['path']),
+                result['cost']
+            ))
+    return rows
+
+def build_bank(path, seeds, cities=None, sizes=None, max_workers=None):
+    """
+    Generates and solves the instances for ``seeds`` across a process pool
+    and writes them to the SQLite file at ``path``. ``sizes`` limits the
+    selection sizes stored (all playable sizes by default). Returns the
+    number of puzzles written.
+    """
+    cities = list(cities or DEFAULT_CITIES)
+    if len(cities) - 1 > EXACT_LIMIT:
+        raise ValueError(f"At most {EXACT_LIMIT + 1} cities can be solved exactly, got {len(cities)}")
+    sizes = set(sizes or range(MIN_SELECTION, len(cities)))
+    jobs = [(seed, home_index) for seed in seeds for home_index in range(len(cities))]
+
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            iu = np.triu_indices(len(cities), k=1)
+            for seed in seeds:
+                matrix = np.asarray(DistanceMatrix.from_pairs(cities, instance_distances(cities, seed)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO instances (seed, cities, distances) VALUES (?, ?, ?)",
+                    (seed, json.dumps(cities), matrix[iu].astype(np.int32).tobytes())
+                )
+
+        written = 0
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for rows in executor.map(
+                _solve_home,
+                [cities] * len(jobs), [seed for seed, _ in jobs], [home for _, home in jobs], [sizes] * len(jobs)
+            ):
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO puzzles (seed, home, selected, size, best_path, best_distance) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                written += len(rows)
+        return written
+    finally:
+        conn.close()
+
+class PuzzleBank:
+    """
+    Read access to a bank file written by ``build_bank``.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+
+    def _execute(self, sql, params=()):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def seeds(self):
+        return [seed for seed, in self._execute("SELECT seed FROM instances ORDER BY seed")]
+
+    def instance(self, seed):
+        """
+        The cities and ``{(city1, city2): distance}`` dict of one instance,
+        or ``None`` if the seed is not banked.
+        """
+        rows = self._execute("SELECT cities, distances FROM instances WHERE seed = ?", (seed,))
+        if not rows:
+            return None
+        cities = json.loads(rows[0][0])
+        values = np.frombuffer(rows[0][1], dtype=np.int32)
+        distances = {}
+        for (i, j), dist in zip(zip(*np.triu_indices(len(cities), k=1)), values.tolist()):
+            distances[(cities[i], cities[j])] = dist
+            distances[(cities[j], cities[i])] = dist
+        return cities, distances
+
+    def lookup(self, seed, home, selected):
+        """
+        The optimal tour for visiting ``selected`` from ``home`` on instance
+        ``seed`` as ``{'path': [city, ...], 'cost'}``, or ``None``.
+        """
+        rows = self._execute(
+            "SELECT best_path, best_distance FROM puzzles WHERE seed = ? AND home = ? AND selected = ?",
+            (seed, home, _selection_key(selected))
+        )
+        if not rows:
+            return None
+        return {'path': rows[0][0].split(","), 'cost': rows[0][1]}
+
+def open_bank(path=DEFAULT_PATH):
+    """
+    The puzzle bank at ``path``, or ``None`` if no bank has been built.
+    """
+    return PuzzleBank(path) if os.path.exists(path) else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed puzzle bank.")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--seeds', type=int, default=10, help="number of instances to generate")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--cities', nargs='+', default=DEFAULT_CITIES)
+    parser.add_argument('--sizes', type=int, nargs='+', help="selection sizes to store (default: all)")
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    written = build_bank(args.path, seeds, args.cities, args.sizes, args.workers)
+    print(f"{written} puzzles written to {args.path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,367 @@
+import abc
+import datetime
+import json
+import sqlite3
+import threading
+import uuid
+
+# Sort directions, spelled like Firestore's Query.ASCENDING / DESCENDING
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+def performance_record(entry):
+    """
+    Turns one ``algorithm_data`` entry, ``(name, time)`` or
+    ``(name, time, metrics)``, into the stored performance fields. Metrics
+    are the runners' optional ``cpu_time``, ``peak_memory`` and
+    ``counters``.
+    """
+    algo_name, exec_time, *rest = entry
+    record = {"algorithm_name": algo_name, "execution_time": exec_time}
+    if rest:
+        record.update((field, value) for field, value in rest[0].items() if value is not None)
+    return record
+
+class StorageBackend(abc.ABC):
+    """
+    Interface shared by the game's storage backends.
+
+    Backends implement ``save_game_result``, ``save_algorithm_performance``
+    and ``query``; the remaining methods have defaults built on those.
+    """
+
+    # Largest value list a backend accepts in one "in" filter
+    max_in_values = 30
+
+    def initialize_db(self):
+        pass
+
+    @abc.abstractmethod
+    def save_game_result(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, idempotency_key=None
+    ):
+        pass
+
+    @abc.abstractmethod
+    def save_algorithm_performance(self, game_id, algorithm_data):
+        pass
+
+    @abc.abstractmethod
+    def query(self, collection_name, filters=None, order_by=None, direction=DESCENDING, limit=None):
+        pass
+
+    def queue_game_result(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, algorithm_data,
+        idempotency_key=None
+    ):
+        game_id = self.save_game_result(
+            player_name, home_city, selected_cities, user_path,
+            user_distance, is_optimal, best_path, best_distance, idempotency_key
+        )
+        if game_id is not None:
+            self.save_algorithm_performance(game_id, algorithm_data)
+        return game_id
+
+    def get_algorithm_performance(self, game_ids):
+        game_ids = list(dict.fromkeys(game_ids))
+        performance = {game_id: [] for game_id in game_ids}
+        for start in range(0, len(game_ids), self.max_in_values):
+            chunk = game_ids[start:start + self.max_in_values]
+            for doc in self.query("tsp_algorithm_performance", filters=[("game_id", "in", chunk)]):
+                performance.setdefault(doc["game_id"], []).append(doc)
+        return performance
+
+    def top_players(self, limit=10):
+        """
+        Leaderboard read from the per-player aggregates: most optimal games
+        first, then shortest optimal distance. On Firestore this needs a
+        composite index on (optimal_count DESC, best_distance ASC).
+        """
+        return self.query(
+            "tsp_player_stats",
+            order_by=[("optimal_count", DESCENDING), ("best_distance", ASCENDING)],
+            limit=limit
+        )
+
+class SQLiteDatabase(StorageBackend):
+    """
+    Embedded SQLite backend for tests, benchmarks and offline runs.
+
+    Uses WAL journaling so readers never block the writer, one connection
+    per thread, and ``executemany`` for multi-row inserts. Collections map
+    to tables of the same name; list-valued fields are stored as JSON.
+    """
+
+    max_in_values = 500
+
+    SCHEMA = {
+        "tsp_game_results": {
+            "id": "TEXT PRIMARY KEY",
+            "player_name": "TEXT NOT NULL",
+            "home_city": "TEXT",
+            "selected_cities": "TEXT",
+            "user_path": "TEXT",
+            "user_distance": "REAL",
+            "is_optimal": "INTEGER",
+            "best_path": "TEXT",
+            "best_distance": "REAL",
+            "algorithm_performance": "TEXT",
+            "timestamp": "TEXT NOT NULL",
+        },
+        "tsp_algorithm_performance": {
+            "id": "TEXT PRIMARY KEY",
+            "game_id": "TEXT NOT NULL",
+            "algorithm_name": "TEXT",
+            "execution_time": "REAL",
+            "cpu_time": "REAL",
+            "peak_memory": "INTEGER",
+            "counters": "TEXT",
+            "timestamp": "TEXT NOT NULL",
+        },
+        "tsp_player_stats": {
+            "id": "TEXT PRIMARY KEY",
+            "player_name": "TEXT NOT NULL",
+            "optimal_count": "INTEGER NOT NULL",
+            "best_distance": "REAL",
+            "last_played": "TEXT",
+        },
+    }
+    INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_game_results_timestamp ON tsp_game_results (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_game_results_is_optimal ON tsp_game_results (is_optimal)",
+        "CREATE INDEX IF NOT EXISTS idx_algorithm_performance_game_id ON tsp_algorithm_performance (game_id)",
+        "CREATE INDEX IF NOT EXISTS idx_player_stats_rank ON tsp_player_stats (optimal_count DESC, best_distance)",
+    ]
+    JSON_FIELDS = {"selected_cities", "algorithm_performance", "counters"}
+    BOOL_FIELDS = {"is_optimal"}
+    TIME_FIELDS = {"timestamp", "last_played"}
+    OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    def __init__(self, path="tsp.sqlite3"):
+        self.path = path
+        self._local = threading.local()
+        print(f"\u2705 SQLite database opened at {path}")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def initialize_db(self):
+        conn = self._connection()
+        with conn:
+            for table, columns in self.SCHEMA.items():
+                definition = ", ".join(f"{name} {kind}" for name, kind in columns.items())
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+                # Tables created by older versions gain any columns added since
+                existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for name, kind in columns.items():
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+            for statement in self.INDEXES:
+                conn.execute(statement)
+        print("\u2705 SQLite schema ready")
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def _game_row(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, algorithm_data=None,
+        idempotency_key=None
+    ):
+        return {
+            "id": idempotency_key or uuid.uuid4().hex,
+            "player_name": player_name.strip(),
+            "home_city": home_city,
+            "selected_cities": json.dumps(list(selected_cities) if selected_cities else []),
+            "user_path": user_path,
+            "user_distance": user_distance,
+            "is_optimal": int(bool(is_optimal)),
+            "best_path": best_path,
+            "best_distance": best_distance,
+            "algorithm_performance": None if algorithm_data is None else json.dumps([
+                performance_record(entry) for entry in algorithm_data
+            ]),
+            "timestamp": self._now(),
+        }
+
+    def _insert_game(self, conn, row):
+        """
+        Inserts a game and updates its leaderboard aggregate. Returns False,
+        changing nothing, when a game with the same ID already exists.
+        """
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        cursor = conn.execute(
+            f"INSERT INTO tsp_game_results ({columns}) VALUES ({placeholders}) ON CONFLICT(id) DO NOTHING",
+            list(row.values())
+        )
+        if cursor.rowcount == 0:
+            return False
+        if row["is_optimal"]:
+            conn.execute(
+                "INSERT INTO tsp_player_stats (id, player_name, optimal_count, best_distance, last_played) "
+                "VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "optimal_count = optimal_count + 1, "
+                "best_distance = MIN(best_distance, excluded.best_distance), "
+                "last_played = excluded.last_played",
+                (row["player_name"], row["player_name"], row["user_distance"], row["timestamp"])
+            )
+        return True
+
+    def _insert_performance(self, conn, game_id, algorithm_data):
+        timestamp = self._now()
+        rows = []
+        for entry in algorithm_data:
+            record = performance_record(entry)
+            counters = record.get("counters")
+            rows.append((
+                uuid.uuid4().hex, game_id, record["algorithm_name"], record["execution_time"],
+                record.get("cpu_time"), record.get("peak_memory"),
+                None if counters is None else json.dumps(counters), timestamp
+            ))
+        conn.executemany(
+            "INSERT INTO tsp_algorithm_performance "
+            "(id, game_id, algorithm_name, execution_time, cpu_time, peak_memory, counters, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def save_game_result(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, idempotency_key=None
+    ):
+        if not player_name or not isinstance(player_name, str):
+            print("Invalid player name")
+            return None
+
+        try:
+            row = self._game_row(
+                player_name, home_city, selected_cities, user_path,
+                user_distance, is_optimal, best_path, best_distance,
+                idempotency_key=idempotency_key
+            )
+            conn = self._connection()
+            with conn:
+                saved = self._insert_game(conn, row)
+            print("\u2705 Game result saved" if saved else "\u2705 Game result already saved")
+            return row["id"]
+        except Exception as e:
+            print(f"\u274C Failed to save game result: {e}")
+            return None
+
+    def save_algorithm_performance(self, game_id, algorithm_data):
+        if not game_id:
+            print("\u274C Invalid game_id")
+            return
+
+        try:
+            conn = self._connection()
+            with conn:
+                self._insert_performance(conn, game_id, algorithm_data)
+            print("\u2705 Algorithm performance saved")
+        except Exception as e:
+            print(f"\u274C Failed to save algorithm performance: {e}")
+
+    def queue_game_result(
+        self, player_name, home_city, selected_cities, user_path,
+        user_distance, is_optimal, best_path, best_distance, algorithm_data,
+        idempotency_key=None
+    ):
+        """
+        Saves a game, its leaderboard aggregate and its timings in one
+        transaction. SQLite commits locally, so nothing is deferred. A game
+        whose ``idempotency_key`` was already saved is left untouched.
+        """
+        if not player_name or not isinstance(player_name, str):
+            print("Invalid player name")
+            return None
+
+        try:
+            row = self._game_row(
+                player_name, home_city, selected_cities, user_path,
+                user_distance, is_optimal, best_path, best_distance, algorithm_data,
+                idempotency_key
+            )
+            conn = self._connection()
+            with conn:
+                saved = self._insert_game(conn, row)
+                if saved:
+                    self._insert_performance(conn, row["id"], algorithm_data)
+            print("\u2705 Game result saved" if saved else "\u2705 Game result already saved")
+            return row["id"]
+        except Exception as e:
+            print(f"\u274C Failed to save game result: {e}")
+            return None
+
+    def _column(self, collection_name, field):
+        if field not in self.SCHEMA[collection_name]:
+            raise ValueError(f"Unknown field {field!r} for {collection_name}")
+        return field
+
+    def _decode(self, row):
+        doc = dict(row)
+        for field, value in doc.items():
+            if value is None:
+                continue
+            if field in self.JSON_FIELDS:
+                doc[field] = json.loads(value)
+            elif field in self.BOOL_FIELDS:
+                doc[field] = bool(value)
+            elif field in self.TIME_FIELDS:
+                doc[field] = datetime.datetime.fromisoformat(value)
+        return doc
+
+    def query(self, collection_name, filters=None, order_by=None, direction=DESCENDING, limit=None):
+        # order_by is a field name, or a list of (field, direction) pairs
+        try:
+            if collection_name not in self.SCHEMA:
+                raise ValueError(f"Unknown collection {collection_name!r}")
+            sql = f"SELECT * FROM {collection_name}"
+            params = []
+
+            clauses = []
+            for field, op, value in filters or []:
+                column = self._column(collection_name, field)
+                if op == "in":
+                    values = list(value)
+                    if not values:
+                        return []
+                    clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                    params.extend(values)
+                else:
+                    clauses.append(f"{column} {self.OPERATORS[op]} ?")
+                    params.append(int(value) if isinstance(value, bool) else value)
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+
+            if isinstance(order_by, (list, tuple)):
+                ordering = list(order_by)
+            elif order_by:
+                ordering = [(order_by, direction)]
+            else:
+                ordering = []
+            if ordering:
+                sql += " ORDER BY " + ", ".join(
+                    f"{self._column(collection_name, field)} {'DESC' if field_direction == DESCENDING else 'ASC'}"
+                    for field, field_direction in ordering
+                )
+
+            if limit:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+
+            return [self._decode(row) for row in self._connection().execute(sql, params)]
+        except Exception as e:
+            print(f"\u274C Failed to execute query: {e}")
+            return []
@@ -1,59 +1,286 @@
 import unittest
-from unittest.mock import patch, MagicMock
+import os
+import tempfile
+import threading
+from unittest import mock
 
-from database import Database
+from database import FirestoreWriteQueue, QueryCache
+from storage import ASCENDING, DESCENDING, SQLiteDatabase, StorageBackend
 import sys
-import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-class TestDatabase(unittest.TestCase):
+class TestSQLiteDatabase(unittest.TestCase):
 
     def setUp(self):
-        self.db = Database()
-
-    @patch('mysql.connector.connect')
-    def test_connect_success(self, mock_connect):
-        mock_connect.return_value = MagicMock()
-        self.db.connect()
-        mock_connect.assert_called_once()
-
-    @patch('mysql.connector.connect')
-    def test_connect_failure(self, mock_connect):
-        mock_connect.side_effect = Exception("Database connection error")
-        with self.assertRaises(Exception):
-            self.db.connect()
-
-    @patch('mysql.connector.connect')
-    def test_initialize_db(self, mock_connect):
-        mock_cursor = MagicMock()
-        mock_connection = MagicMock()
-        mock_connection.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_connection
-
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDatabase(os.path.join(self.tmpdir.name, 'tsp.sqlite3'))
         self.db.initialize_db()
-        mock_cursor.execute.assert_called()
 
-    @patch('mysql.connector.connect')
-    def test_save_game_result(self, mock_connect):
-        mock_cursor = MagicMock()
-        mock_connection = MagicMock()
-        mock_connection.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_connection
+    def tearDown(self):
+        self.db._connection().close()
+        self.tmpdir.cleanup()
 
+    def test_initialize_db_uses_wal(self):
+        mode = self.db._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_save_game_result(self):
         game_id = self.db.save_game_result(
-            'Player1', 'A', ['B', 'C'], 'A-B-C-A', 100, True, True, 'A-B-C-A', 90
+            'Player1', 'A', ['B', 'C'], 'A,B,C,A', 100, True, 'A -> C -> B -> A', 90
         )
         self.assertIsNotNone(game_id)
-        mock_cursor.execute.assert_called()
+        games = self.db.query("tsp_game_results", filters=[("is_optimal", "==", True)])
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0]['id'], game_id)
+        self.assertEqual(games[0]['selected_cities'], ['B', 'C'])
+        self.assertIs(games[0]['is_optimal'], True)
+
+    def test_save_game_result_rejects_invalid_name(self):
+        self.assertIsNone(self.db.save_game_result('', 'A', ['B'], 'A,B,A', 10, False, 'A -> B -> A', 10))
+
+    def test_save_algorithm_performance(self):
+        self.db.save_algorithm_performance('game-1', [('Brute Force', 0.5), ('Held-Karp', 1.2)])
+        self.db.save_algorithm_performance('game-2', [('Nearest Neighbor', 0.1)])
+        performance = self.db.get_algorithm_performance(['game-1', 'game-2', 'game-3'])
+        self.assertEqual(sorted(p['algorithm_name'] for p in performance['game-1']), ['Brute Force', 'Held-Karp'])
+        self.assertEqual(len(performance['game-2']), 1)
+        self.assertEqual(performance['game-3'], [])
+
+    def test_save_algorithm_performance_metrics(self):
+        metrics = {'cpu_time': 0.4, 'peak_memory': 2048, 'counters': {'states_expanded': 24}}
+        self.db.save_algorithm_performance('game-1', [('Held-Karp', 0.5, metrics), ('Nearest Neighbor', 0.1)])
+        performance = {p['algorithm_name']: p for p in self.db.get_algorithm_performance(['game-1'])['game-1']}
+        self.assertEqual(performance['Held-Karp']['peak_memory'], 2048)
+        self.assertEqual(performance['Held-Karp']['counters'], {'states_expanded': 24})
+        self.assertIsNone(performance['Nearest Neighbor']['cpu_time'])
+
+    def test_initialize_db_adds_new_columns(self):
+        path = os.path.join(self.tmpdir.name, 'old.sqlite3')
+        old = SQLiteDatabase(path)
+        old._connection().execute(
+            "CREATE TABLE tsp_algorithm_performance (id TEXT PRIMARY KEY, game_id TEXT NOT NULL, "
+            "algorithm_name TEXT, execution_time REAL, timestamp TEXT NOT NULL)"
+        )
+        old.initialize_db()
+        old.save_algorithm_performance('game-1', [('Held-Karp', 0.5, {'cpu_time': 0.4})])
+        self.assertEqual(old.query("tsp_algorithm_performance")[0]['cpu_time'], 0.4)
+        old._connection().close()
+
+    def test_query_order_and_limit(self):
+        for distance in (300, 100, 200):
+            self.db.save_game_result('Player1', 'A', ['B'], 'A,B,A', distance, False, 'A -> B -> A', 100)
+        games = self.db.query("tsp_game_results", order_by="user_distance", direction=ASCENDING, limit=2)
+        self.assertEqual([g['user_distance'] for g in games], [100, 200])
+        games = self.db.query("tsp_game_results", order_by="timestamp", direction=DESCENDING, limit=1)
+        self.assertEqual(len(games), 1)
+
+    def test_queue_game_result_updates_leaderboard(self):
+        self.db.queue_game_result('Ann', 'A', ['B'], 'A,B,A', 120, True, 'A -> B -> A', 120, [('Held-Karp', 0.1)])
+        self.db.queue_game_result('Ann', 'A', ['B'], 'A,B,A', 90, True, 'A -> B -> A', 90, [('Held-Karp', 0.1)])
+        self.db.queue_game_result('Bob', 'A', ['B'], 'A,B,A', 80, True, 'A -> B -> A', 80, [('Held-Karp', 0.1)])
+        self.db.queue_game_result('Cy', 'A', ['B'], 'A,B,A', 95, False, 'A -> B -> A', 70, [('Held-Karp', 0.1)])
+        top = self.db.top_players()
+        self.assertEqual([(p['player_name'], p['optimal_count'], p['best_distance']) for p in top],
+                         [('Ann', 2, 90), ('Bob', 1, 80)])
+        game = self.db.query("tsp_game_results", limit=1)[0]
+        self.assertEqual(game['algorithm_performance'][0]['algorithm_name'], 'Held-Karp')
+
+    def test_idempotency_key_saves_once(self):
+        for _ in range(3):
+            game_id = self.db.queue_game_result(
+                'Ann', 'A', ['B'], 'A,B,A', 90, True, 'A -> B -> A', 90,
+                [('Held-Karp', 0.1), ('Nearest Neighbor', 0.01)], idempotency_key='game-key-1'
+            )
+            self.assertEqual(game_id, 'game-key-1')
+        self.assertEqual(len(self.db.query("tsp_game_results")), 1)
+        self.assertEqual(len(self.db.query("tsp_algorithm_performance")), 2)
+        self.assertEqual(self.db.top_players()[0]['optimal_count'], 1)
+
+    def test_backend_requires_core_methods(self):
+        class PartialBackend(StorageBackend):
+            def query(self, collection_name, filters=None, order_by=None, direction=DESCENDING, limit=None):
+                return []
+
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+    def test_query_rejects_unknown_fields(self):
+        self.assertEqual(self.db.query("tsp_game_results", filters=[("1=1; --", "==", 1)]), [])
+
+class AlreadyExists(Exception):
+    pass
+
+class FakeBatch:
+
+    def __init__(self, client):
+        self.client = client
+        self.writes = []
+
+    def create(self, doc_ref, data):
+        self.writes.append((doc_ref, data, "create"))
+
+    def set(self, doc_ref, data, merge=False):
+        self.writes.append((doc_ref, data, "merge" if merge else "set"))
+
+    def commit(self):
+        self.client.commit(self.writes)
+
+class FakeFirestore:
+    """
+    Records committed batches. Commits on the writer thread wait for
+    ``release``, the first ``failures`` commits fail, and creating an
+    existing document raises ``AlreadyExists``.
+    """
+
+    def __init__(self, failures=0, existing=()):
+        self.failures = failures
+        self.existing = set(existing)
+        self.attempts = 0
+        self.batches = []
+        self.threads = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def commit(self, writes):
+        self.attempts += 1
+        if threading.current_thread().name == "firestore-writer":
+            self.started.set()
+            self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("unavailable")
+        if any(mode == "create" and doc_ref in self.existing for doc_ref, _, mode in writes):
+            raise AlreadyExists(writes)
+        self.existing.update(doc_ref for doc_ref, _, _ in writes)
+        self.batches.append([doc_ref for doc_ref, _, _ in writes])
+        self.threads.append(threading.current_thread().name)
+
+@mock.patch('database._already_exists', lambda error: isinstance(error, AlreadyExists))
+class TestFirestoreWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeFirestore()
+        self.queue = FirestoreWriteQueue(self.client, base_delay=0)
+
+    def tearDown(self):
+        self.client.release.set()
+        self.queue.close()
+
+    def hold_writer(self):
+        # Parks the writer thread in a commit so later groups wait in the queue
+        self.client.release.clear()
+        self.queue.submit([("game-0", {}, "create")])
+        self.assertTrue(self.client.started.wait(5))
+
+    def test_waiting_groups_fold_into_one_batch(self):
+        self.hold_writer()
+        self.queue.submit([("game-1", {}, "create"), ("stats/Ann", {}, "merge")])
+        self.queue.submit([("game-2", {}, "set")])
+        self.client.release.set()
+        self.queue.flush()
+        self.assertEqual(self.client.batches, [["game-0"], ["game-1", "stats/Ann", "game-2"]])
+
+    def test_failed_commit_retries_with_backoff(self):
+        self.client.failures = 2
+        committed = []
+        queue = FirestoreWriteQueue(self.client, base_delay=0.5, on_commit=committed.append)
+        with mock.patch('database.time.sleep') as sleep:
+            queue.submit([("game-1", {}, "create")])
+            queue.close()
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.5, 1.0])
+        self.assertEqual(self.client.attempts, 3)
+        self.assertEqual(committed, [[("game-1", {}, "create")]])
+
+    def test_gives_up_after_max_retries(self):
+        self.client.failures = 10
+        queue = FirestoreWriteQueue(self.client, max_retries=2, base_delay=0)
+        queue.submit([("game-1", {}, "create")])
+        queue.close()
+        self.assertEqual(self.client.attempts, 3)
+        self.assertEqual(self.client.batches, [])
+
+    def test_full_queue_commits_synchronously(self):
+        self.queue = FirestoreWriteQueue(self.client, max_pending=1, base_delay=0)
+        self.hold_writer()
+        self.queue.submit([("game-1", {}, "create")])
+        self.queue.submit([("game-2", {}, "create")])
+        self.assertEqual(self.client.batches, [["game-2"]])
+        self.assertEqual(self.client.threads, [threading.current_thread().name])
+        self.client.release.set()
+        self.queue.flush()
+        self.assertEqual(self.client.batches, [["game-2"], ["game-0"], ["game-1"]])
+
+    def test_duplicate_create_is_dropped_alone(self):
+        self.client.existing.add("game-1")
+        self.hold_writer()
+        self.queue.submit([("game-1", {}, "create"), ("stats/Ann", {"wins": 1}, "merge")])
+        self.queue.submit([("game-2", {}, "create")])
+        self.client.release.set()
+        self.queue.flush()
+        self.assertEqual(self.client.batches, [["game-0"], ["game-2"]])
+
+    def test_flush_and_close(self):
+        self.queue.flush()
+        self.queue.submit([("game-1", {}, "create")])
+        self.queue.flush()
+        self.assertEqual(self.client.batches, [["game-1"]])
+
+        self.queue.submit([("game-2", {}, "create")])
+        self.queue.close()
+        self.assertEqual(self.client.batches, [["game-1"], ["game-2"]])
+        self.assertFalse(self.queue._thread.is_alive())
+        self.queue.flush()
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QueryCache(max_entries=2, ttl=30)
+        self.games = QueryCache.make_key("tsp_game_results", [("is_optimal", "==", True)], "timestamp", DESCENDING, 10)
+        self.players = QueryCache.make_key("player_stats", None, None, DESCENDING, None)
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch('database.time.monotonic', return_value=100.0):
+            self.cache.put(self.games, ['game-1'])
+        with mock.patch('database.time.monotonic', return_value=130.0):
+            self.assertEqual(self.cache.get(self.games), ['game-1'])
+        with mock.patch('database.time.monotonic', return_value=130.5):
+            self.assertIsNone(self.cache.get(self.games))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        recent = QueryCache.make_key("tsp_game_results", None, "timestamp", DESCENDING, 1)
+        self.cache.put(self.games, ['game-1'])
+        self.cache.put(self.players, ['Ann'])
+        self.cache.get(self.games)
+        self.cache.put(recent, ['game-2'])
+        self.assertIsNone(self.cache.get(self.players))
+        self.assertEqual(self.cache.get(self.games), ['game-1'])
+        self.assertEqual(self.cache.get(recent), ['game-2'])
+
+    def test_invalidate_drops_only_named_collections(self):
+        self.cache.put(self.games, ['game-1'])
+        self.cache.put(self.players, ['Ann'])
+        self.cache.invalidate("tsp_game_results", "tsp_algorithm_performance")
+        self.assertIsNone(self.cache.get(self.games))
+        self.assertEqual(self.cache.get(self.players), ['Ann'])
 
-    @patch('mysql.connector.connect')
-    def test_save_algorithm_performance(self, mock_connect):
-        mock_cursor = MagicMock()
-        mock_connection = MagicMock()
-        mock_connection.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_connection
+    def test_make_key_freezes_filters(self):
+        key = QueryCache.make_key("tsp_game_results", (("is_optimal", "==", True),), "timestamp", DESCENDING, 10)
+        self.assertEqual(key, self.games)
+        hash(key)
 
-        self.db.save_algorithm_performance(1, [('Brute Force', 0.5), ('Held-Karp', 1.2)])
-        mock_cursor.execute.assert_called()
+    def test_stats(self):
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.0)
+        self.cache.put(self.games, [])
+        self.cache.get(self.games)
+        self.cache.get(self.players)
+        self.cache.invalidate("tsp_game_results")
+        self.assertEqual(self.cache.stats(), {
+            "hits": 1, "misses": 1, "invalidations": 1, "entries": 0, "hit_rate": 0.5
+        })
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Cold import of app.py, rendering the welcome page, must stay under this
+IMPORT_TIME_BUDGET = 2.0
+
+HEAVY_MODULES = ['networkx', 'matplotlib', 'pandas', 'plotly', 'numpy', 'firebase_admin', 'google.cloud.firestore']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+@unittest.skipUnless(
+    importlib.util.find_spec('streamlit') and importlib.util.find_spec('dotenv'),
+    'streamlit and python-dotenv are required to import app.py'
+)
+class TestAppStartup(unittest.TestCase):
+
+    def test_welcome_page_cold_start(self):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        self.assertEqual(result['loaded'], [])
+        self.assertLess(result['elapsed'], IMPORT_TIME_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
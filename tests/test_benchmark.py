@@ -0,0 +1,38 @@
+import unittest
+
+import benchmark
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestBenchmark(unittest.TestCase):
+
+    def test_instances_are_seeded(self):
+        for kind in benchmark.INSTANCE_KINDS:
+            self.assertEqual(benchmark.generate_instance(kind, 6, 1), benchmark.generate_instance(kind, 6, 1))
+            self.assertNotEqual(benchmark.generate_instance(kind, 6, 1), benchmark.generate_instance(kind, 6, 2))
+
+        symmetric = benchmark.generate_instance('symmetric', 6, 0)
+        self.assertTrue(all(symmetric[i][j] == symmetric[j][i] for i in range(6) for j in range(6)))
+
+    def test_records_gap_against_optimum(self):
+        records = benchmark.run_benchmark(
+            [6], kinds=['asymmetric'], algorithms=['Held-Karp', 'Nearest Neighbor'], warmup=0, repeats=1
+        )
+        self.assertEqual([r['algorithm'] for r in records], ['Held-Karp', 'Nearest Neighbor'])
+        exact, heuristic = records
+        self.assertEqual(exact['gap'], 0)
+        self.assertGreaterEqual(heuristic['gap'], 0)
+        self.assertGreater(exact['peak_memory_bytes'], 0)
+
+    def test_baseline_comparison_flags_regressions(self):
+        baseline = [{'kind': 'euclidean', 'n': 8, 'algorithm': 'Held-Karp', 'time_median': 0.01, 'gap': 0.0}]
+        same = [dict(baseline[0])]
+        slower = [dict(baseline[0], time_median=0.02)]
+        worse = [dict(baseline[0], gap=0.1)]
+
+        self.assertEqual(benchmark.compare_to_baseline(same, baseline), [])
+        self.assertEqual(len(benchmark.compare_to_baseline(slower, baseline)), 1)
+        self.assertEqual(len(benchmark.compare_to_baseline(worse, baseline)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+from tsp_algorithms import ALGORITHMS
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestDistanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.cities = ['A', 'B', 'C', 'D']
+        self.distances = {}
+        for (a, b), d in {('A', 'B'): 10, ('A', 'C'): 15, ('A', 'D'): 20,
+                          ('B', 'C'): 35, ('B', 'D'): 25, ('C', 'D'): 30}.items():
+            self.distances[(a, b)] = d
+            self.distances[(b, a)] = d
+        self.dist_matrix = [
+            [0, 10, 15, 20],
+            [10, 0, 35, 25],
+            [15, 35, 0, 30],
+            [20, 25, 30, 0]
+        ]
+
+    def test_from_pairs_condenses_symmetric_instances(self):
+        matrix = DistanceMatrix.from_pairs(self.cities, self.distances)
+        self.assertTrue(matrix.condensed)
+        self.assertEqual(matrix.nbytes, 6 * 8)
+        self.assertEqual(matrix.tolist(), self.dist_matrix)
+        self.assertEqual(matrix[1, 3], 25)
+        self.assertEqual(matrix[2, 2], 0)
+        np.testing.assert_array_equal(matrix[2], self.dist_matrix[2])
+
+    def test_asymmetric_pairs_stay_full(self):
+        distances = dict(self.distances)
+        distances[('A', 'B')] = 12
+        matrix = DistanceMatrix.from_pairs(self.cities, distances)
+        self.assertFalse(matrix.condensed)
+        self.assertEqual(matrix[0, 1], 12)
+        self.assertEqual(matrix[1, 0], 10)
+        with self.assertRaises(ValueError):
+            DistanceMatrix(np.asarray(matrix), condensed=True)
+
+    def test_path_cost(self):
+        for condensed in (False, True):
+            matrix = DistanceMatrix(self.dist_matrix, condensed=condensed)
+            cost = matrix.path_cost([0, 1, 3, 2, 0])
+            self.assertEqual(cost, 80)
+            self.assertIsInstance(cost, int)
+
+    def test_every_algorithm_accepts_distance_matrix(self):
+        matrix = DistanceMatrix.from_pairs(self.cities, self.distances)
+        for name, func in ALGORITHMS.items():
+            expected = func(self.dist_matrix, 0)
+            result = func(matrix, 0)
+            self.assertEqual(result['cost'], expected['cost'], name)
+            self.assertIsInstance(result['cost'], int, name)
+
+if __name__ == '__main__':
+    unittest.main()
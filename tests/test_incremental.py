@@ -0,0 +1,68 @@
+import math
+import random
+import unittest
+
+from incremental import IncrementalSolver
+from tsp_algorithms import held_karp_tsp, tour_cost
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestIncrementalSolver(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(12)
+        n = 11
+        self.dist_matrix = [[0 if i == j else rng.randint(50, 100) for j in range(n)] for i in range(n)]
+        self.home_index = 4
+
+    def optimum(self, cities):
+        order = [self.home_index] + list(cities)
+        sub = [[self.dist_matrix[a][b] for b in order] for a in order]
+        return held_karp_tsp(sub, 0)['cost']
+
+    def assert_valid(self, solver):
+        result = solver.result()
+        self.assertEqual(result['path'][0], self.home_index)
+        self.assertEqual(result['path'][-1], self.home_index)
+        self.assertEqual(sorted(result['path'][1:-1]), sorted(solver.cities))
+        self.assertEqual(result['cost'], tour_cost(self.dist_matrix, result['path']))
+        return result
+
+    def test_insert_and_remove_stay_exact(self):
+        solver = IncrementalSolver(self.dist_matrix, self.home_index)
+        rng = random.Random(5)
+        for _ in range(40):
+            city = rng.randrange(len(self.dist_matrix))
+            if city in solver.cities:
+                solver.remove(city)
+            else:
+                solver.insert(city)
+            result = self.assert_valid(solver)
+            self.assertTrue(result['exact'])
+            self.assertEqual(result['cost'], self.optimum(solver.cities))
+
+    def test_insert_reuses_table(self):
+        solver = IncrementalSolver(self.dist_matrix, self.home_index, [0, 1, 2, 3, 5, 6])
+        solver.insert(7)
+        # Only the subsets containing the new city are computed
+        new_states = sum(bin(mask).count('1') for mask in range(2 ** 6, 2 ** 7))
+        self.assertEqual(solver.states_expanded, new_states)
+        self.assertLess(new_states, 7 * 2 ** 6)
+
+    def test_heuristic_beyond_exact_limit(self):
+        rng = random.Random(3)
+        points = [(rng.random(), rng.random()) for _ in range(25)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        self.dist_matrix, self.home_index = dist_matrix, 0
+
+        solver = IncrementalSolver(dist_matrix, 0, range(1, 20), exact_limit=8, time_limit=0.1)
+        self.assertFalse(solver.exact)
+        self.assert_valid(solver)
+        for city in range(8, 20):
+            solver.remove(city)
+            self.assert_valid(solver)
+        self.assertTrue(solver.exact)
+        self.assertAlmostEqual(solver.cost, self.optimum(solver.cities))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import itertools
+import math
+import random
+import unittest
+
+from lower_bounds import assignment_bound, lower_bound, one_tree_bound, optimality_gap
+from tsp_algorithms import held_karp_tsp, nearest_neighbor_tsp
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestLowerBounds(unittest.TestCase):
+
+    def setUp(self):
+        self.dist_matrix = [
+            [0, 10, 15, 20],
+            [10, 0, 35, 25],
+            [15, 35, 0, 30],
+            [20, 25, 30, 0]
+        ]
+
+    def test_bounds_never_exceed_optimum(self):
+        rng = random.Random(7)
+        for n in (3, 6, 9):
+            symmetric = [[0] * n for _ in range(n)]
+            for i in range(n):
+                for j in range(i + 1, n):
+                    symmetric[i][j] = symmetric[j][i] = rng.randint(1, 100)
+            asymmetric = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+            for dist_matrix in (symmetric, asymmetric):
+                optimum = held_karp_tsp(dist_matrix, 0)['cost']
+                self.assertLessEqual(one_tree_bound(dist_matrix), optimum)
+                self.assertLessEqual(assignment_bound(dist_matrix), optimum)
+
+    def test_assignment_bound_matches_brute_force(self):
+        rng = random.Random(3)
+        n = 6
+        dist_matrix = [[0 if i == j else rng.randint(1, 50) for j in range(n)] for i in range(n)]
+        expected = min(
+            sum(dist_matrix[i][p[i]] for i in range(n))
+            for p in itertools.permutations(range(n)) if all(p[i] != i for i in range(n))
+        )
+        self.assertEqual(assignment_bound(dist_matrix), expected)
+
+    def test_certifies_optimal_tour(self):
+        optimal = held_karp_tsp(self.dist_matrix, 0)
+        result = optimality_gap(self.dist_matrix, optimal['path'])
+        self.assertTrue(result['certified'])
+        self.assertEqual(result['gap'], 0)
+        self.assertEqual(result['lower_bound'], optimal['cost'])
+
+    def test_gap_of_heuristic_tour(self):
+        rng = random.Random(11)
+        points = [(rng.random(), rng.random()) for _ in range(40)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        tour = nearest_neighbor_tsp(dist_matrix, 0)
+        bound = lower_bound(dist_matrix)
+        result = optimality_gap(dist_matrix, tour['path'], bound=bound)
+        self.assertEqual(result['lower_bound'], bound)
+        self.assertLessEqual(bound, tour['cost'])
+        self.assertAlmostEqual(result['gap'], (tour['cost'] - bound) / bound)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+from puzzle_bank import PuzzleBank, build_bank, instance_distances, open_bank
+from tsp_algorithms import held_karp_tsp
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestPuzzleBank(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'puzzles.sqlite3')
+        self.cities = ['A', 'B', 'C', 'D', 'E', 'F']
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_instances_are_seeded(self):
+        self.assertEqual(instance_distances(self.cities, 3), instance_distances(self.cities, 3))
+        self.assertNotEqual(instance_distances(self.cities, 3), instance_distances(self.cities, 4))
+
+    def test_stored_tours_are_optimal(self):
+        written = build_bank(self.path, [7], self.cities, max_workers=2)
+        # Every home city with every selection of three to five other cities
+        self.assertEqual(written, 6 * (10 + 5 + 1))
+
+        bank = PuzzleBank(self.path)
+        self.assertEqual(bank.seeds(), [7])
+        cities, distances = bank.instance(7)
+        self.assertEqual(cities, self.cities)
+        self.assertEqual(distances, instance_distances(self.cities, 7))
+
+        for selected in itertools.combinations('BCDEF', 4):
+            puzzle = bank.lookup(7, 'A', reversed(selected))
+            order = ['A'] + list(selected)
+            dist_matrix = [[0 if a == b else distances[(a, b)] for b in order] for a in order]
+            self.assertEqual(puzzle['cost'], held_karp_tsp(dist_matrix, 0)['cost'])
+            self.assertEqual(puzzle['path'][0], 'A')
+            self.assertEqual(sorted(puzzle['path'][1:-1]), sorted(selected))
+
+        self.assertIsNone(bank.lookup(7, 'A', ['B']))
+        self.assertIsNone(bank.instance(8))
+
+    def test_open_bank_without_file(self):
+        self.assertIsNone(open_bank(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,19 @@
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
 import unittest
 
-from tsp_algorithms import brute_force_tsp, held_karp_tsp, nearest_neighbor_tsp, run_tsp_algorithms
+import numpy as np
+
+from tsp_algorithms import (
+    branch_and_bound_tsp, brute_force_tsp, christofides_tsp, dispatch_tsp_algorithms, plan_tsp_algorithms, held_karp_tsp, held_karp_numpy_tsp, nearest_neighbor_tsp,
+    parallel_brute_force_tsp, run_tsp_algorithms, run_tsp_algorithms_concurrent,
+    SolutionCache, improve_tour, matrix_fingerprint, multi_start_nearest_neighbor_tsp,
+    nearest_neighbor_2opt_tsp, simulated_annealing_tsp, tour_cost
+)
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -28,12 +41,143 @@ class TestTSPAlgorithms(unittest.TestCase):
         self.assertTrue(result['path'])
         self.assertGreater(result['cost'], 0)
 
+    def test_held_karp_matches_brute_force(self):
+        rng = random.Random(7)
+        n = 8
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        for home_index in (0, 5):
+            expected = brute_force_tsp(dist_matrix, home_index)
+            result = held_karp_tsp(dist_matrix, home_index)
+            self.assertEqual(result['cost'], expected['cost'])
+            self.assertEqual(result['path'][0], home_index)
+            self.assertEqual(result['path'][-1], home_index)
+            self.assertEqual(sorted(result['path'][1:-1]), [i for i in range(n) if i != home_index])
+
+    def test_held_karp_numpy_matches_held_karp(self):
+        rng = random.Random(11)
+        n = 9
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        for home_index in (0, 3):
+            expected = held_karp_tsp(dist_matrix, home_index)
+            result = held_karp_numpy_tsp(dist_matrix, home_index)
+            self.assertEqual(result['cost'], expected['cost'])
+            self.assertIsInstance(result['cost'], int)
+            self.assertEqual(sorted(result['path'][1:-1]), [i for i in range(n) if i != home_index])
+
+    def test_branch_and_bound_matches_held_karp(self):
+        rng = random.Random(3)
+        n = 9
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        for home_index in (0, 4):
+            expected = held_karp_tsp(dist_matrix, home_index)
+            result = branch_and_bound_tsp(dist_matrix, home_index)
+            self.assertEqual(result['cost'], expected['cost'])
+            self.assertEqual(result['path'][0], home_index)
+            self.assertEqual(sorted(result['path'][1:-1]), [i for i in range(n) if i != home_index])
+
+    def test_parallel_brute_force_matches_brute_force(self):
+        rng = random.Random(5)
+        n = 8
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        expected = brute_force_tsp(dist_matrix, 2)
+        result = parallel_brute_force_tsp(dist_matrix, 2, max_workers=2)
+        self.assertEqual(result['cost'], expected['cost'])
+        self.assertEqual(sorted(result['path'][1:-1]), [i for i in range(n) if i != 2])
+
     def test_nearest_neighbor_tsp(self):
         result = nearest_neighbor_tsp(self.dist_matrix, self.home_index)
         self.assertIsNotNone(result)
         self.assertTrue(result['path'])
         self.assertGreater(result['cost'], 0)
 
+    def test_multi_start_nearest_neighbor_tsp(self):
+        rng = random.Random(4)
+        n = 40
+        dist_matrix = [[0 if i == j else rng.randint(1, 1000) for j in range(n)] for i in range(n)]
+        expected = min(nearest_neighbor_tsp(dist_matrix, start)['cost'] for start in range(n))
+        result = multi_start_nearest_neighbor_tsp(dist_matrix, 7, batch_size=16)
+        self.assertEqual(result['cost'], expected)
+        self.assertEqual(result['path'][0], 7)
+        self.assertEqual(result['path'][-1], 7)
+        self.assertEqual(sorted(result['path'][:-1]), list(range(n)))
+
+    def test_nearest_neighbor_2opt_tsp(self):
+        rng = random.Random(2)
+        points = [(rng.random(), rng.random()) for _ in range(60)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        greedy = nearest_neighbor_tsp(dist_matrix, 4)
+        result = nearest_neighbor_2opt_tsp(dist_matrix, 4)
+        self.assertEqual(result['path'][0], 4)
+        self.assertEqual(result['path'][-1], 4)
+        self.assertEqual(sorted(result['path'][:-1]), list(range(60)))
+        self.assertLess(result['cost'], greedy['cost'])
+        self.assertAlmostEqual(result['cost'], tour_cost(dist_matrix, result['path']))
+
+    def test_christofides_within_bound(self):
+        rng = random.Random(5)
+        for n in (2, 5, 11):
+            points = [(rng.random(), rng.random()) for _ in range(n)]
+            dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+            result = christofides_tsp(dist_matrix, n - 1)
+            self.assertEqual(result['path'][0], n - 1)
+            self.assertEqual(result['path'][-1], n - 1)
+            self.assertEqual(sorted(result['path'][:-1]), list(range(n)))
+            self.assertLessEqual(result['cost'], 1.5 * held_karp_tsp(dist_matrix, n - 1)['cost'] + 1e-9)
+
+    def test_christofides_large_instance_uses_greedy_matching(self):
+        rng = random.Random(6)
+        points = [(rng.random(), rng.random()) for _ in range(150)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        result = christofides_tsp(dist_matrix, 0)
+        self.assertEqual(sorted(result['path'][:-1]), list(range(150)))
+        self.assertAlmostEqual(result['cost'], tour_cost(dist_matrix, result['path']))
+
+    def test_simulated_annealing_streams_improvements(self):
+        rng = random.Random(3)
+        points = [(rng.random(), rng.random()) for _ in range(30)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        incumbents = []
+        result = simulated_annealing_tsp(dist_matrix, 2, time_limit=0.2, seed=1, on_improvement=incumbents.append)
+        self.assertEqual(incumbents[0]['cost'], nearest_neighbor_tsp(dist_matrix, 2)['cost'])
+        costs = [incumbent['cost'] for incumbent in incumbents]
+        self.assertEqual(costs, sorted(set(costs), reverse=True))
+        times = [incumbent['elapsed'] for incumbent in incumbents]
+        self.assertEqual(times, sorted(set(times)))
+        self.assertAlmostEqual(result['cost'], costs[-1])
+        self.assertEqual(result['path'][0], 2)
+        self.assertEqual(sorted(result['path'][:-1]), list(range(30)))
+        self.assertAlmostEqual(result['cost'], tour_cost(dist_matrix, result['path']))
+
+    def test_simulated_annealing_keeps_time_limit_on_large_instances(self):
+        rng = random.Random(5)
+        points = [(rng.random(), rng.random()) for _ in range(1000)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        for matrix in (dist_matrix, np.array(dist_matrix)):
+            start = time.perf_counter()
+            result = simulated_annealing_tsp(matrix, 0, time_limit=0.3, seed=0)
+            self.assertLessEqual(time.perf_counter() - start, 0.3 + 0.1)
+            self.assertGreater(result['counters']['iterations'], 0)
+            self.assertEqual(sorted(result['path'][:-1]), list(range(1000)))
+
+    def test_simulated_annealing_asymmetric(self):
+        rng = random.Random(8)
+        n = 8
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        result = simulated_annealing_tsp(dist_matrix, 0, time_limit=0.1, seed=0)
+        self.assertGreaterEqual(result['cost'], held_karp_tsp(dist_matrix, 0)['cost'])
+        self.assertLessEqual(result['cost'], nearest_neighbor_tsp(dist_matrix, 0)['cost'])
+        self.assertEqual(result['cost'], tour_cost(dist_matrix, result['path']))
+
+    def test_improve_tour_asymmetric_never_worsens(self):
+        rng = random.Random(9)
+        n = 8
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        start = brute_force_tsp(dist_matrix, 0)
+        result = improve_tour(dist_matrix, nearest_neighbor_tsp(dist_matrix, 0)['path'])
+        self.assertGreaterEqual(result['cost'], start['cost'])
+        self.assertLessEqual(result['cost'], nearest_neighbor_tsp(dist_matrix, 0)['cost'])
+        self.assertEqual(result['cost'], tour_cost(dist_matrix, result['path']))
+
     def test_run_tsp_algorithms(self):
         results = run_tsp_algorithms(self.dist_matrix, self.home_index)
         self.assertEqual(len(results), 3)  
@@ -42,5 +186,136 @@ class TestTSPAlgorithms(unittest.TestCase):
             self.assertIn('path', result)
             self.assertIn('cost', result)
 
+    def test_run_tsp_algorithms_by_name(self):
+        results = run_tsp_algorithms(self.dist_matrix, self.home_index, algorithms=['Held-Karp (NumPy)'])
+        self.assertEqual([r['algorithm'] for r in results], ['Held-Karp (NumPy)'])
+        self.assertEqual(results[0]['cost'], brute_force_tsp(self.dist_matrix, self.home_index)['cost'])
+
+    def test_run_tsp_algorithms_instrumented(self):
+        results = run_tsp_algorithms(self.dist_matrix, self.home_index, instrument=True)
+        for result in results:
+            self.assertGreaterEqual(result['cpu_time'], 0)
+            self.assertGreater(result['peak_memory'], 0)
+        counters = {r['algorithm']: r['counters'] for r in results}
+        self.assertEqual(counters['Brute Force'], {'permutations': 6})
+        self.assertGreater(counters['Held-Karp']['states_expanded'], 0)
+
+        plain = run_tsp_algorithms(self.dist_matrix, self.home_index, algorithms=['Branch and Bound'])
+        self.assertNotIn('peak_memory', plain[0])
+        self.assertGreater(plain[0]['counters']['nodes_expanded'], 0)
+
+    def test_plan_tsp_algorithms_skips_factorial_solvers(self):
+        plan = plan_tsp_algorithms(15)
+        self.assertEqual(plan['run'], ['Held-Karp', 'Nearest Neighbor'])
+        self.assertEqual([s['algorithm'] for s in plan['skipped']], ['Brute Force'])
+        self.assertTrue(plan['skipped'][0]['reason'])
+        self.assertEqual(plan['authoritative'], 'Held-Karp')
+
+        plan = plan_tsp_algorithms(40)
+        self.assertEqual(plan['run'], ['Nearest Neighbor', 'Nearest Neighbor + 2-opt'])
+        self.assertEqual(plan['authoritative'], 'Nearest Neighbor')
+
+    def test_plan_tsp_algorithms_caps_branch_and_bound(self):
+        self.assertEqual(plan_tsp_algorithms(12, ['Branch and Bound'])['run'], ['Branch and Bound'])
+        for n in (13, 16):
+            plan = plan_tsp_algorithms(n, ['Held-Karp', 'Branch and Bound'])
+            self.assertEqual([s['algorithm'] for s in plan['skipped']], ['Branch and Bound'])
+
+    def test_dispatch_tsp_algorithms_picks_cheapest_heuristic_tour(self):
+        rng = random.Random(3)
+        points = [(rng.random(), rng.random()) for _ in range(40)]
+        dist_matrix = [[math.dist(a, b) for b in points] for a in points]
+        dispatch = dispatch_tsp_algorithms(
+            dist_matrix, 0, algorithms=['Nearest Neighbor', 'Nearest Neighbor + 2-opt', 'Christofides + 2-opt']
+        )
+        self.assertEqual(dispatch['authoritative'], 'Nearest Neighbor')
+        self.assertEqual(dispatch['best']['cost'], min(r['cost'] for r in dispatch['results']))
+        self.assertLess(dispatch['best']['cost'], nearest_neighbor_tsp(dist_matrix, 0)['cost'])
+
+    def test_dispatch_tsp_algorithms(self):
+        dispatch = dispatch_tsp_algorithms(self.dist_matrix, self.home_index)
+        self.assertEqual(len(dispatch['results']), 3)
+        self.assertEqual(dispatch['skipped'], [])
+        self.assertEqual(dispatch['best']['cost'], brute_force_tsp(self.dist_matrix, self.home_index)['cost'])
+
+    def test_run_tsp_algorithms_concurrent(self):
+        results = run_tsp_algorithms_concurrent(self.dist_matrix, self.home_index, time_budget=10.0)
+        self.assertEqual([r['algorithm'] for r in results], ['Brute Force', 'Held-Karp', 'Nearest Neighbor'])
+        for result in results:
+            self.assertFalse(result['timed_out'])
+            self.assertTrue(result['path'])
+
+    def test_run_tsp_algorithms_concurrent_timeout(self):
+        rng = random.Random(1)
+        n = 13
+        dist_matrix = [[0 if i == j else rng.randint(1, 100) for j in range(n)] for i in range(n)]
+        results = run_tsp_algorithms_concurrent(
+            dist_matrix, 0, algorithms=['Brute Force', 'Nearest Neighbor'], budgets={'Brute Force': 0.2}
+        )
+        by_name = {r['algorithm']: r for r in results}
+        self.assertTrue(by_name['Brute Force']['timed_out'])
+        self.assertEqual(by_name['Brute Force']['cost'], float('inf'))
+        self.assertFalse(by_name['Nearest Neighbor']['timed_out'])
+
+class TestSolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dist_matrix = [
+            [0, 10, 15, 20],
+            [10, 0, 35, 25],
+            [15, 35, 0, 30],
+            [20, 25, 30, 0]
+        ]
+
+    def test_fingerprint_is_canonical(self):
+        as_tuples = tuple(tuple(float(d) for d in row) for row in self.dist_matrix)
+        self.assertEqual(matrix_fingerprint(self.dist_matrix, 0), matrix_fingerprint(as_tuples, 0))
+        self.assertNotEqual(matrix_fingerprint(self.dist_matrix, 0), matrix_fingerprint(self.dist_matrix, 1))
+
+    def test_get_or_compute_counts_hits_and_evicts(self):
+        cache = SolutionCache(max_entries=1)
+        calls = []
+        compute = lambda: calls.append(1) or brute_force_tsp(self.dist_matrix, 0)
+        first = cache.get_or_compute(self.dist_matrix, 0, compute)
+        second = cache.get_or_compute(self.dist_matrix, 0, compute)
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+        cache.get_or_compute(self.dist_matrix, 1, compute)
+        cache.get_or_compute(self.dist_matrix, 0, compute)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 3)
+
+    def test_ttl_expiry(self):
+        cache = SolutionCache(ttl=-1)
+        key = matrix_fingerprint(self.dist_matrix, 0)
+        cache.put(key, {'cost': 1})
+        self.assertIsNone(cache.get(key))
+
+    def test_disk_tier_survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'solutions.sqlite')
+            key = matrix_fingerprint(self.dist_matrix, 0)
+            SolutionCache(disk_path=path).put(key, {'cost': 80})
+            cache = SolutionCache(disk_path=path)
+            self.assertEqual(cache.get(key), {'cost': 80})
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_disk_tier_evicts_expired_and_oldest_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'solutions.sqlite')
+            cache = SolutionCache(ttl=60, disk_path=path, max_disk_entries=2)
+            cache._execute(
+                "INSERT INTO solutions (key, created, value) VALUES (?, ?, ?)",
+                ('stale', time.time() - 120, b'')
+            )
+            for cost in (1, 2, 3):
+                cache.put(f'key-{cost}', {'cost': cost})
+            conn = sqlite3.connect(path)
+            rows = conn.execute("SELECT key FROM solutions ORDER BY created").fetchall()
+            conn.close()
+            self.assertEqual(rows, [('key-2',), ('key-3',)])
+            self.assertIsNone(SolutionCache(disk_path=path).get('key-1'))
+
 if __name__ == '__main__':
     unittest.main()
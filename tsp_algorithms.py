@@ -1,24 +1,78 @@
+import hashlib
 import itertools
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import sqlite3
+import threading
 import time
+import tracemalloc
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-def run_tsp_algorithms(dist_matrix, home_index):
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+
+DEFAULT_TIME_BUDGET = 5.0
+DEFAULT_LATENCY_TARGET = 2.0
+
+# Algorithm workers are spawned, not forked: the app starts gRPC clients and
+# writer threads before solving, and forking after that can hang children
+_worker_context = multiprocessing.get_context('spawn')
+
+# Set TSP_INSTRUMENT=1 to record CPU time and peak memory for every game
+INSTRUMENT = os.environ.get('TSP_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+
+def _measured_call(func, dist_matrix, home_index, instrument=False):
     """
-    Runs three TSP algorithms and returns their results.
+    Calls a solver and returns its result with its metrics: wall ``time``
+    always, and with ``instrument`` also ``cpu_time`` and ``peak_memory``
+    (bytes traced by tracemalloc). Tracing slows Python-heavy solvers, so
+    instrumented wall times run high.
     """
-    algorithms = [
-        ('Brute Force', brute_force_tsp),
-        ('Held-Karp', held_karp_tsp),
-        ('Nearest Neighbor', nearest_neighbor_tsp)
-    ]
-    
-    results = []
-    
-    for name, func in algorithms:
+    metrics = {}
+    started_tracing = False
+    if instrument:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            started_tracing = True
+        cpu_start = time.process_time()
+    try:
         start_time = time.perf_counter()
+        result = func(dist_matrix, home_index)
+        metrics['time'] = time.perf_counter() - start_time
+        if instrument:
+            metrics['cpu_time'] = time.process_time() - cpu_start
+            metrics['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return result, metrics
+
+def run_tsp_algorithms(dist_matrix, home_index, algorithms=None, instrument=False):
+    """
+    Runs TSP algorithms and returns their results.
+
+    ``algorithms`` is a list of names from ``ALGORITHMS``; by default the
+    three algorithms in ``DEFAULT_ALGORITHMS`` are run. Each result carries
+    the solver's ``counters``; with ``instrument`` it also has ``cpu_time``
+    and ``peak_memory``.
+    """
+    if algorithms is None:
+        algorithms = DEFAULT_ALGORITHMS
+
+    results = []
+
+    for name in algorithms:
+        func = ALGORITHMS[name]
         try:
-            result = func(dist_matrix, home_index)
-            end_time = time.perf_counter()
-            exec_time = end_time - start_time
+            result, metrics = _measured_call(func, dist_matrix, home_index, instrument)
         
             if result['path'] is None and result['cost'] == float('inf'):
                 continue  
@@ -27,7 +81,8 @@ def run_tsp_algorithms(dist_matrix, home_index):
                 'algorithm': name,
                 'path': result['path'] or [],  
                 'cost': result['cost'],
-                'time': exec_time
+                **metrics,
+                'counters': result.get('counters', {})
             })
         except Exception as e:
             print(f"Algorithm {name} failed: {e}")
@@ -35,10 +90,317 @@ def run_tsp_algorithms(dist_matrix, home_index):
     
     return results
 
+def estimate_runtime(name, n):
+    """
+    Estimates the wall-clock seconds algorithm ``name`` needs for ``n`` cities.
+    """
+    model = ALGORITHM_COST_MODELS[name]
+    return model['operations'](n) / model['ops_per_second']
+
+def plan_tsp_algorithms(n, algorithms=None, latency_target=DEFAULT_LATENCY_TARGET):
+    """
+    Decides which algorithms to run on an ``n``-city instance.
+
+    Algorithms whose estimated runtime exceeds ``latency_target`` are
+    skipped with a reason. By default, instances too large for every exact
+    algorithm also run ``DEFAULT_IMPROVEMENT``. The authoritative algorithm
+    is the cheapest exact algorithm that runs, or the cheapest heuristic if
+    none does.
+    """
+    if algorithms is None:
+        algorithms = DEFAULT_ALGORITHMS
+        if all(estimate_runtime(name, n) > latency_target
+               for name in algorithms if ALGORITHM_COST_MODELS[name]['exact']):
+            algorithms = algorithms + [DEFAULT_IMPROVEMENT]
+
+    run = []
+    skipped = []
+    for name in algorithms:
+        estimate = estimate_runtime(name, n)
+        if estimate > latency_target:
+            skipped.append({
+                'algorithm': name,
+                'reason': f"estimated {estimate:.3g}s exceeds the {latency_target}s latency target for {n} cities"
+            })
+        else:
+            run.append(name)
+
+    exact = [name for name in run if ALGORITHM_COST_MODELS[name]['exact']]
+    candidates = exact or run
+    authoritative = min(candidates, key=lambda name: estimate_runtime(name, n)) if candidates else None
+
+    return {'run': run, 'skipped': skipped, 'authoritative': authoritative}
+
+def dispatch_tsp_algorithms(dist_matrix, home_index, algorithms=None,
+                            latency_target=DEFAULT_LATENCY_TARGET, runner=None, instrument=False):
+    """
+    Runs only the algorithms that fit the latency target for this instance.
+
+    ``runner`` is ``run_tsp_algorithms`` unless given (for example
+    ``run_tsp_algorithms_concurrent``); ``instrument`` is passed on to it.
+    Returns the runner's results, the
+    skipped algorithms with reasons, the authoritative algorithm name and
+    ``best``: the authoritative result when it is exact and finished,
+    otherwise the cheapest finished tour.
+    """
+    runner = runner or run_tsp_algorithms
+    plan = plan_tsp_algorithms(len(dist_matrix), algorithms, latency_target)
+    results = runner(dist_matrix, home_index, algorithms=plan['run'], instrument=instrument)
+
+    finished = [res for res in results if not res.get('timed_out')]
+    best = None
+    if plan['authoritative'] and ALGORITHM_COST_MODELS[plan['authoritative']]['exact']:
+        best = next((res for res in finished if res['algorithm'] == plan['authoritative']), None)
+    if best is None and finished:
+        best = min(finished, key=lambda res: res['cost'])
+
+    return {
+        'results': results,
+        'skipped': plan['skipped'],
+        'authoritative': plan['authoritative'],
+        'best': best
+    }
+
+def matrix_fingerprint(dist_matrix, home_index, variant=''):
+    """
+    Hashes a distance matrix and home index into a canonical cache key.
+
+    Values are normalised to float64, so equal matrices given as lists,
+    tuples or arrays share a key. ``variant`` separates results computed
+    with different settings for the same instance.
+    """
+    matrix = np.ascontiguousarray(dist_matrix, dtype=np.float64)
+    digest = hashlib.sha256()
+    digest.update(repr((matrix.shape, home_index, variant)).encode())
+    digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+class SolutionCache:
+    """
+    LRU cache of solver results keyed by ``matrix_fingerprint``.
+
+    Entries expire after ``ttl`` seconds (``None`` keeps them forever). When
+    ``disk_path`` is set, entries are also written to a SQLite file there
+    so they survive process restarts; each write deletes expired rows and
+    the oldest beyond ``max_disk_entries``.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600, disk_path=None, max_disk_entries=4096):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_path:
+            self._transaction([
+                ("CREATE TABLE IF NOT EXISTS solutions "
+                 "(key TEXT PRIMARY KEY, created REAL NOT NULL, value BLOB NOT NULL)", ()),
+                ("CREATE INDEX IF NOT EXISTS idx_solutions_created ON solutions (created)", ())
+            ])
+
+    def _transaction(self, statements):
+        """
+        Runs ``(sql, params)`` statements in one transaction and returns the
+        first row of the last one.
+        """
+        conn = sqlite3.connect(self.disk_path, timeout=30)
+        try:
+            with conn:
+                for sql, params in statements:
+                    cursor = conn.execute(sql, params)
+                return cursor.fetchone()
+        finally:
+            conn.close()
+
+    def _execute(self, sql, params=()):
+        return self._transaction([(sql, params)])
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remember(self, key, created, value):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns the cached value for ``key`` or ``None``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self.disk_path:
+                row = self._execute("SELECT created, value FROM solutions WHERE key = ?", (key,))
+                if row is not None and not self._expired(row[0]):
+                    value = pickle.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+            if self.disk_path:
+                statements = [(
+                    "INSERT OR REPLACE INTO solutions (key, created, value) VALUES (?, ?, ?)",
+                    (key, created, pickle.dumps(value))
+                )]
+                if self.ttl is not None:
+                    statements.append(("DELETE FROM solutions WHERE created < ?", (created - self.ttl,)))
+                statements.append((
+                    "DELETE FROM solutions WHERE key NOT IN "
+                    "(SELECT key FROM solutions ORDER BY created DESC LIMIT ?)",
+                    (self.max_disk_entries,)
+                ))
+                self._transaction(statements)
+
+    def get_or_compute(self, dist_matrix, home_index, compute, variant=''):
+        """
+        Returns the cached result for this instance, calling ``compute()``
+        and caching its result on a miss.
+        """
+        key = matrix_fingerprint(dist_matrix, home_index, variant)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.disk_path:
+                self._execute("DELETE FROM solutions")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'entries': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+solution_cache = SolutionCache(disk_path=os.environ.get('TSP_SOLUTION_CACHE_PATH'))
+
+def _run_algorithm_worker(name, dist_matrix, home_index, conn, instrument=False):
+    """
+    Runs one algorithm in a child process and sends its outcome back.
+    """
+    try:
+        result, metrics = _measured_call(ALGORITHMS[name], dist_matrix, home_index, instrument)
+        conn.send(('ok', result, metrics))
+    except Exception as e:
+        conn.send(('error', str(e), None))
+    finally:
+        conn.close()
+
+def run_tsp_algorithms_concurrent(dist_matrix, home_index, algorithms=None,
+                                  time_budget=DEFAULT_TIME_BUDGET, budgets=None, instrument=False):
+    """
+    Runs TSP algorithms concurrently, each in its own process.
+
+    Every algorithm gets ``time_budget`` seconds of wall-clock time, or the
+    value for its name in ``budgets``. Algorithms that overrun are
+    terminated and reported with ``timed_out`` set, an empty path and an
+    infinite cost; the other entries match ``run_tsp_algorithms``. CPU
+    time and peak memory are measured in the algorithm's own process.
+    Workers are started with the spawn method, so budgets include the
+    interpreter start-up.
+    """
+    if algorithms is None:
+        algorithms = DEFAULT_ALGORITHMS
+    budgets = budgets or {}
+    if not isinstance(dist_matrix, DistanceMatrix):
+        dist_matrix = [list(row) for row in dist_matrix]
+
+    workers = []
+    launch_time = time.perf_counter()
+    for name in algorithms:
+        parent_conn, child_conn = _worker_context.Pipe(duplex=False)
+        process = _worker_context.Process(
+            target=_run_algorithm_worker,
+            args=(name, dist_matrix, home_index, child_conn, instrument)
+        )
+        process.start()
+        child_conn.close()
+        workers.append((name, process, parent_conn, budgets.get(name, time_budget)))
+
+    results = []
+
+    for name, process, conn, budget in workers:
+        remaining = max(0.0, launch_time + budget - time.perf_counter())
+        try:
+            outcome = conn.recv() if conn.poll(remaining) else None
+        except EOFError:
+            outcome = ('error', 'worker exited without a result', None)
+        finally:
+            conn.close()
+
+        if outcome is None:
+            process.terminate()
+            process.join()
+            results.append({
+                'algorithm': name,
+                'path': [],
+                'cost': float('inf'),
+                'time': budget,
+                'counters': {},
+                'timed_out': True
+            })
+            continue
+
+        process.join()
+        status, result, metrics = outcome
+        if status == 'error':
+            print(f"Algorithm {name} failed: {result}")
+            continue
+        if result['path'] is None and result['cost'] == float('inf'):
+            continue
+
+        results.append({
+            'algorithm': name,
+            'path': result['path'] or [],
+            'cost': result['cost'],
+            **metrics,
+            'counters': result.get('counters', {}),
+            'timed_out': False
+        })
+
+    return results
+
+def _as_rows(dist_matrix):
+    """
+    List-of-lists view for solvers that index ``dist_matrix[i][j]`` in
+    Python loops; a ``DistanceMatrix`` is expanded once up front.
+    """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return dist_matrix.tolist()
+    return dist_matrix
+
 def brute_force_tsp(dist_matrix, home_index):
     """
     Brute-force exact algorithm (for small n).
     """
+    dist_matrix = _as_rows(dist_matrix)
     n = len(dist_matrix)
     cities = [i for i in range(n) if i != home_index]
     
@@ -61,108 +423,308 @@ def brute_force_tsp(dist_matrix, home_index):
             min_cost = current_cost
             min_path = current_path
     
-    return {'path': min_path, 'cost': min_cost}
+    return {'path': min_path, 'cost': min_cost, 'counters': {'permutations': math.factorial(len(cities))}}
+
+_brute_force_worker = {}
+
+def _init_brute_force_worker(dist_matrix, home_index, shared_best):
+    """
+    Ships the distance matrix and the shared incumbent to a pool worker once.
+    """
+    _brute_force_worker['dist_matrix'] = dist_matrix
+    _brute_force_worker['home_index'] = home_index
+    _brute_force_worker['shared_best'] = shared_best
+
+def _brute_force_shard(prefix):
+    """
+    Enumerates every tour that starts with ``home + prefix``.
+    """
+    dist_matrix = _brute_force_worker['dist_matrix']
+    home_index = _brute_force_worker['home_index']
+    shared_best = _brute_force_worker['shared_best']
+
+    head = [home_index] + list(prefix)
+    head_cost = sum(dist_matrix[head[i]][head[i + 1]] for i in range(len(head) - 1))
+    rest = [i for i in range(len(dist_matrix)) if i not in head]
+
+    min_cost = float('inf')
+    min_path = None
+
+    bound = float('inf')
+    count = -1
+    pruned = 0
+
+    for count, perm in enumerate(itertools.permutations(rest)):
+        if count % 1024 == 0:
+            bound = min(bound, shared_best.value)
+        current_cost = head_cost
+        prev = head[-1]
+        for city in perm:
+            current_cost += dist_matrix[prev][city]
+            if current_cost >= bound:
+                pruned += 1
+                break
+            prev = city
+        else:
+            current_cost += dist_matrix[prev][home_index]
+            if current_cost < bound:
+                bound = min_cost = current_cost
+                min_path = head + list(perm) + [home_index]
+                with shared_best.get_lock():
+                    if min_cost < shared_best.value:
+                        shared_best.value = min_cost
+
+    return min_cost, min_path, count + 1, pruned
+
+def parallel_brute_force_tsp(dist_matrix, home_index, max_workers=None, prefix_length=2):
+    """
+    Brute-force exact algorithm sharded across a process pool.
+
+    The permutation space is split by the first ``prefix_length`` cities
+    after home. Workers share the best cost found so far and abandon
+    permutations as soon as their partial cost reaches it.
+    """
+    n = len(dist_matrix)
+    cities = [i for i in range(n) if i != home_index]
+
+    if len(cities) <= prefix_length:
+        return brute_force_tsp(dist_matrix, home_index)
+
+    dist_matrix = [list(row) for row in _as_rows(dist_matrix)]
+    prefixes = list(itertools.permutations(cities, prefix_length))
+    shared_best = _worker_context.Value('d', float('inf'))
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=_worker_context,
+        initializer=_init_brute_force_worker,
+        initargs=(dist_matrix, home_index, shared_best)
+    ) as executor:
+        shard_results = list(executor.map(_brute_force_shard, prefixes, chunksize=max(1, len(prefixes) // 64)))
+
+    min_cost = float('inf')
+    min_path = None
+    for cost, path, _, _ in shard_results:
+        if path is not None and cost < min_cost:
+            min_cost = cost
+            min_path = path
+
+    counters = {
+        'permutations': sum(shard[2] for shard in shard_results),
+        'permutations_pruned': sum(shard[3] for shard in shard_results)
+    }
+    return {'path': min_path, 'cost': min_cost, 'counters': counters}
+
+def branch_and_bound_tsp(dist_matrix, home_index):
+    """
+    Depth-first branch-and-bound exact algorithm.
+
+    Partial tours are extended one city at a time, nearest candidates
+    first. A branch is pruned when its cost plus the cheapest outgoing
+    edge of every city still to be left cannot beat the incumbent, which
+    starts as the nearest-neighbor tour.
+    """
+    dist_matrix = _as_rows(dist_matrix)
+    n = len(dist_matrix)
+    cities = [i for i in range(n) if i != home_index]
+
+    if not cities:
+        return {'path': [home_index, home_index], 'cost': 0}
+
+    seed = nearest_neighbor_tsp(dist_matrix, home_index)
+    best = {'path': seed['path'], 'cost': seed['cost']}
+    counters = {'nodes_expanded': 0, 'nodes_pruned': 0}
+
+    min_out = [min(dist_matrix[i][j] for j in range(n) if j != i) for i in range(n)]
+    neighbors = [sorted(cities, key=lambda j, i=i: dist_matrix[i][j]) for i in range(n)]
+    visited = [False] * n
+    visited[home_index] = True
+    path = [home_index]
+
+    def search(current, cost, remaining_bound):
+        counters['nodes_expanded'] += 1
+        if len(path) == n:
+            total = cost + dist_matrix[current][home_index]
+            if total < best['cost']:
+                best['cost'] = total
+                best['path'] = path + [home_index]
+            return
+
+        # Every unvisited city, and the current one, still has to be left once
+        remaining_bound -= min_out[current]
+        row = dist_matrix[current]
+        for nxt in neighbors[current]:
+            if visited[nxt]:
+                continue
+            new_cost = cost + row[nxt]
+            if new_cost + remaining_bound >= best['cost']:
+                counters['nodes_pruned'] += 1
+                continue
+            visited[nxt] = True
+            path.append(nxt)
+            search(nxt, new_cost, remaining_bound)
+            path.pop()
+            visited[nxt] = False
+
+    search(home_index, 0, sum(min_out))
+    best['counters'] = counters
+    return best
+
+def _dp_typecode(dist_matrix):
+    """
+    Picks an array typecode for DP costs: integer matrices keep integer
+    costs, anything else falls back to doubles.
+    """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return ('q', 2 ** 62) if dist_matrix.dtype.kind in 'iu' else ('d', float('inf'))
+    for row in dist_matrix:
+        for d in row:
+            if not isinstance(d, (int, np.integer)):
+                return 'd', float('inf')
+    return 'q', 2 ** 62
 
 def held_karp_tsp(dist_matrix, home_index):
     """
     Dynamic Programming (Held-Karp) exact algorithm.
+
+    Cost and parent tables are flat arrays indexed by ``mask * k + j``,
+    where ``mask`` is the set of visited cities (excluding home) and ``j``
+    the last city of the partial tour. Masks are visited in increasing
+    integer order, so every state is final before it is extended.
     """
+    dist_matrix = _as_rows(dist_matrix)
     n = len(dist_matrix)
     cities = [i for i in range(n) if i != home_index]
-    num_cities = len(cities)
-    
-    if num_cities == 0:
+    k = len(cities)
+
+    if k == 0:
         return {'path': [home_index, home_index], 'cost': 0}
-    
-    # Mapping between city indices and subset indices
-    city_to_idx = {city: idx for idx, city in enumerate(cities)}
-    idx_to_city = {idx: city for idx, city in enumerate(cities)}
-    
-    memo = {}
-    
+
+    typecode, unreachable = _dp_typecode(dist_matrix)
+    w = [[dist_matrix[a][b] for b in cities] for a in cities]
+    full = (1 << k) - 1
+
+    cost = array(typecode, [unreachable]) * ((full + 1) * k)
+    parent = array('b', [-1]) * ((full + 1) * k)
+
     # Initialize base cases
-    for idx in range(num_cities):
-        city = cities[idx]
-        mask = 1 << idx
-        memo[(mask, idx)] = (dist_matrix[home_index][city], home_index)
-    
-    # Build DP table for subsets
-    for subset_size in range(2, num_cities + 1):
-        for subset in itertools.combinations(range(num_cities), subset_size):
-            mask = sum(1 << bit for bit in subset)
-            
-            for current in subset:
-                prev_mask = mask & ~(1 << current)
-                min_cost = float('inf')
-                min_prev = -1
-                
-                for prev in subset:
-                    if prev == current:
-                        continue
-                    if (prev_mask, prev) not in memo:
-                        continue
-                    cost, _ = memo[(prev_mask, prev)]
-                    cost += dist_matrix[idx_to_city[prev]][idx_to_city[current]]
-                    if cost < min_cost:
-                        min_cost = cost
-                        min_prev = prev
-                
-                if min_prev != -1:
-                    memo[(mask, current)] = (min_cost, min_prev)
-    
+    for j in range(k):
+        cost[(1 << j) * k + j] = dist_matrix[home_index][cities[j]]
+
+    # Extend every reachable state by one unvisited city
+    states = 0
+    for mask in range(1, full):
+        base = mask * k
+        for j in range(k):
+            if not (mask >> j) & 1:
+                continue
+            c = cost[base + j]
+            if c == unreachable:
+                continue
+            states += 1
+            row = w[j]
+            for nxt in range(k):
+                bit = 1 << nxt
+                if mask & bit:
+                    continue
+                idx = (mask | bit) * k + nxt
+                nc = c + row[nxt]
+                if nc < cost[idx]:
+                    cost[idx] = nc
+                    parent[idx] = j
+
     # Find optimal return path to home
-    mask = (1 << num_cities) - 1
+    base = full * k
     min_total = float('inf')
     best_last = -1
-    
-    for current in range(num_cities):
-        if (mask, current) not in memo:
+
+    for j in range(k):
+        c = cost[base + j]
+        if c == unreachable:
             continue
-        cost, _ = memo[(mask, current)]
-        total_cost = cost + dist_matrix[idx_to_city[current]][home_index]
+        total_cost = c + dist_matrix[cities[j]][home_index]
         if total_cost < min_total:
             min_total = total_cost
-            best_last = current
-    
-    # Reconstruct path if valid
+            best_last = j
+
     if best_last == -1:
         return {'path': None, 'cost': float('inf')}
-    
+
     path = []
-    current_mask = mask
-    current_node = best_last
-    
-    while current_mask:
-        city = idx_to_city[current_node]
-        path.append(city)
-        new_mask = current_mask & ~(1 << current_node)
-        
-        if (current_mask, current_node) not in memo:
-            break
-            
-        _, prev_node = memo[(current_mask, current_node)]
-        
-        if prev_node == home_index:
-            break
-            
-        prev_idx = city_to_idx[prev_node]
-        current_mask = new_mask
-        current_node = prev_idx
-    
+    mask = full
+    j = best_last
+    while j != -1:
+        path.append(cities[j])
+        prev = parent[mask * k + j]
+        mask &= ~(1 << j)
+        j = prev
+
     path.reverse()
-    full_path = [home_index] + path + [home_index]
-    
-    # Add validation to ensure no duplicates (except home)
-    visited = set()
-    for city in full_path[1:-1]:  # Exclude first and last (home)
-        if city in visited:
-            # If duplicates found, fall back to brute force for small n
-            if len(dist_matrix) <= 10:
-                return brute_force_tsp(dist_matrix, home_index)
-            return {'path': None, 'cost': float('inf')}
-        visited.add(city)
-    
-    return {'path': full_path, 'cost': min_total}
+    counters = {'states_expanded': states, 'table_entries': len(cost)}
+    return {'path': [home_index] + path + [home_index], 'cost': min_total, 'counters': counters}
+
+def held_karp_numpy_tsp(dist_matrix, home_index):
+    """
+    Held-Karp exact algorithm vectorized with NumPy.
+
+    The cost table has shape ``(2**k, k)``. Subsets are processed one
+    layer (subset size) at a time, and for each last city the best
+    predecessor over all masks of the layer is a single ``min``/``argmin``.
+    """
+    n = len(dist_matrix)
+    cities = [i for i in range(n) if i != home_index]
+    k = len(cities)
+
+    if k == 0:
+        return {'path': [home_index, home_index], 'cost': 0}
+
+    typecode, _ = _dp_typecode(dist_matrix)
+    d = np.asarray(dist_matrix, dtype=np.float64)
+    w = d[np.ix_(cities, cities)]
+    full = (1 << k) - 1
+
+    cost = np.full((full + 1, k), np.inf)
+    parent = np.full((full + 1, k), -1, dtype=np.int8)
+
+    bits = np.arange(k)
+    cost[1 << bits, bits] = d[home_index, cities]
+
+    masks = np.arange(full + 1)
+    popcount = np.zeros(full + 1, dtype=np.int8)
+    for j in range(k):
+        popcount += (masks >> j) & 1
+
+    states = 0
+    for size in range(2, k + 1):
+        layer = masks[popcount == size]
+        for j in range(k):
+            sel = layer[(layer >> j) & 1 == 1]
+            states += len(sel)
+            cand = cost[sel ^ (1 << j)] + w[:, j]
+            best = np.argmin(cand, axis=1)
+            cost[sel, j] = cand[np.arange(len(sel)), best]
+            parent[sel, j] = best
+
+    totals = cost[full] + d[cities, home_index]
+    best_last = int(np.argmin(totals))
+    min_total = totals[best_last]
+
+    if not np.isfinite(min_total):
+        return {'path': None, 'cost': float('inf')}
+
+    path = []
+    mask = full
+    j = best_last
+    for _ in range(k):
+        path.append(cities[j])
+        prev = int(parent[mask, j])
+        mask &= ~(1 << j)
+        j = prev
+
+    path.reverse()
+    min_total = int(min_total) if typecode == 'q' else float(min_total)
+    counters = {'states_expanded': states, 'table_entries': cost.size}
+    return {'path': [home_index] + path + [home_index], 'cost': min_total, 'counters': counters}
 
 def nearest_neighbor_tsp(dist_matrix, home_index):
     """
@@ -171,22 +733,570 @@ def nearest_neighbor_tsp(dist_matrix, home_index):
     n = len(dist_matrix)
     if n == 0:
         return {'path': [], 'cost': 0}
-    
-    unvisited = set(range(n))
+
+    d = np.asarray(dist_matrix, dtype=np.float64)
+    visited = np.zeros(n, dtype=bool)
     current = home_index
-    unvisited.remove(current)
+    visited[current] = True
     path = [current]
-    total_cost = 0
-    
-    while unvisited:
-        next_city = min(unvisited, key=lambda city: dist_matrix[current][city])
-        total_cost += dist_matrix[current][next_city]
-        path.append(next_city)
-        current = next_city
-        unvisited.remove(current)
-    
+
+    for _ in range(n - 1):
+        current = int(np.argmin(np.where(visited, np.inf, d[current])))
+        visited[current] = True
+        path.append(current)
+
     # Return to home
-    total_cost += dist_matrix[current][home_index]
     path.append(home_index)
-    
-    return {'path': path, 'cost': total_cost}
\ No newline at end of file
+
+    return {'path': path, 'cost': tour_cost(dist_matrix, path)}
+
+def multi_start_nearest_neighbor_tsp(dist_matrix, home_index, starts=None, batch_size=32):
+    """
+    Best nearest-neighbor tour over several start cities.
+
+    Tours from every city in ``starts`` (all cities by default) are built
+    ``batch_size`` at a time with one batched ``argmin`` per step, then the
+    cheapest is rotated to begin at ``home_index``. Small batches keep the
+    working rows in cache, which matters more than batch width for n in
+    the thousands.
+    """
+    n = len(dist_matrix)
+    if n == 0:
+        return {'path': [], 'cost': 0}
+
+    d = np.asarray(dist_matrix, dtype=np.float64)
+    starts = np.arange(n) if starts is None else np.asarray(starts, dtype=np.intp)
+
+    best_tour = None
+    best_cost = np.inf
+
+    for offset in range(0, len(starts), batch_size):
+        current = starts[offset:offset + batch_size]
+        batch = np.arange(len(current))
+        penalty = np.zeros((len(current), n))
+        penalty[batch, current] = np.inf
+        rows = np.empty((len(current), n))
+        tours = np.empty((len(current), n), dtype=np.intp)
+        tours[:, 0] = current
+
+        for step in range(1, n):
+            np.take(d, current, axis=0, out=rows)
+            rows += penalty
+            current = rows.argmin(axis=1)
+            penalty[batch, current] = np.inf
+            tours[:, step] = current
+
+        costs = d[tours[:, :-1], tours[:, 1:]].sum(axis=1) + d[tours[:, -1], tours[:, 0]]
+        idx = int(np.argmin(costs))
+        if costs[idx] < best_cost:
+            best_cost = costs[idx]
+            best_tour = tours[idx].tolist()
+
+    start = best_tour.index(home_index)
+    path = best_tour[start:] + best_tour[:start] + [home_index]
+    return {'path': path, 'cost': tour_cost(dist_matrix, path), 'counters': {'starts': len(starts)}}
+
+def tour_cost(dist_matrix, path):
+    """
+    Total cost of following ``path`` edge by edge.
+    """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return dist_matrix.path_cost(path)
+    return sum(dist_matrix[path[i]][path[i + 1]] for i in range(len(path) - 1))
+
+def _neighbor_lists(d, neighbor_count):
+    """
+    The ``neighbor_count`` nearest other cities of every city, nearest first.
+    """
+    d = np.array(d, dtype=np.float64)
+    n = len(d)
+    count = min(neighbor_count, n - 1)
+    if count <= 0:
+        return [[] for _ in range(n)]
+    np.fill_diagonal(d, np.inf)
+    nearest = np.argpartition(d, count - 1, axis=1)[:, :count]
+    order = np.take_along_axis(d, nearest, axis=1).argsort(axis=1, kind='stable')
+    return np.take_along_axis(nearest, order, axis=1).tolist()
+
+def improve_tour(dist_matrix, path, time_limit=None, neighbor_count=10, rows=None, neighbors=None,
+                 symmetric=None):
+    """
+    Improves a closed tour with 2-opt and Or-opt moves.
+
+    ``path`` starts and ends at the home city, as returned by the solvers.
+    Candidate moves come from each city's ``neighbor_count`` nearest
+    neighbors and are scored in O(1) from the edges they add and remove.
+    The search stops at a local optimum or after ``time_limit`` seconds.
+    2-opt reverses segments, so it is only used on symmetric matrices;
+    Or-opt moves segments of one to three cities without reversing them.
+
+    Callers that already hold the matrix as ``rows`` indexed
+    ``rows[i][j]``, its ``neighbors`` lists and its ``symmetric`` flag can
+    pass all three to skip the O(n^2) setup.
+    """
+    home_index = path[0]
+    tour = list(path[:-1])
+    n = len(tour)
+    if n < 4:
+        return {'path': list(path), 'cost': tour_cost(dist_matrix, path)}
+
+    if rows is None:
+        matrix = np.asarray(dist_matrix)
+        symmetric = np.array_equal(matrix, matrix.T)
+        rows = matrix.tolist()
+        neighbors = _neighbor_lists(matrix, neighbor_count)
+    d = rows
+    pos = [0] * n
+    for idx, city in enumerate(tour):
+        pos[city] = idx
+
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    eps = 1e-9
+    moves = 0
+
+    def two_opt(i):
+        a = tour[i]
+        b = tour[(i + 1) % n]
+        d_ab = d[a][b]
+        for c in neighbors[a]:
+            d_ac = d[a][c]
+            if d_ac >= d_ab:
+                break
+            j = pos[c]
+            e = tour[(j + 1) % n]
+            if c == b or e == a:
+                continue
+            if d_ac + d[b][e] - d_ab - d[c][e] < -eps:
+                lo, hi = min(i, j), max(i, j)
+                tour[lo + 1:hi + 1] = tour[lo + 1:hi + 1][::-1]
+                for idx in range(lo + 1, hi + 1):
+                    pos[tour[idx]] = idx
+                return True
+        p = tour[i - 1]
+        d_pa = d[p][a]
+        for c in neighbors[a]:
+            d_ac = d[a][c]
+            if d_ac >= d_pa:
+                break
+            j = pos[c]
+            cp = tour[j - 1]
+            if c == p or cp == a:
+                continue
+            if d_ac + d[p][cp] - d_pa - d[cp][c] < -eps:
+                lo, hi = min(i, j), max(i, j)
+                tour[lo:hi] = tour[lo:hi][::-1]
+                for idx in range(lo, hi):
+                    pos[tour[idx]] = idx
+                return True
+        return False
+
+    def or_opt(i):
+        for length in (1, 2, 3):
+            if i + length >= n:
+                break
+            seg = tour[i:i + length]
+            first, last = seg[0], seg[-1]
+            p = tour[i - 1]
+            nx = tour[(i + length) % n]
+            removed = d[p][first] + d[last][nx] - d[p][nx]
+            for c in neighbors[first]:
+                if d[c][first] >= removed:
+                    break
+                e = tour[(pos[c] + 1) % n]
+                if c in seg or e in seg:
+                    continue
+                if d[c][first] + d[last][e] - d[c][e] - removed < -eps:
+                    rest = tour[:i] + tour[i + length:]
+                    at = rest.index(c) + 1
+                    tour[:] = rest[:at] + seg + rest[at:]
+                    for idx, city in enumerate(tour):
+                        pos[city] = idx
+                    return True
+        return False
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n):
+            if deadline is not None and time.perf_counter() > deadline:
+                improved = False
+                break
+            if symmetric and two_opt(i):
+                improved = True
+                moves += 1
+            if or_opt(i):
+                improved = True
+                moves += 1
+
+    start = tour.index(home_index)
+    best_path = tour[start:] + tour[:start] + [home_index]
+    return {'path': best_path, 'cost': tour_cost(dist_matrix, best_path), 'counters': {'improving_moves': moves}}
+
+def nearest_neighbor_2opt_tsp(dist_matrix, home_index, time_limit=1.0):
+    """
+    Nearest-neighbor tour improved to a 2-opt / Or-opt local optimum.
+    """
+    if len(dist_matrix) == 0:
+        return {'path': [], 'cost': 0}
+    result = nearest_neighbor_tsp(dist_matrix, home_index)
+    return improve_tour(dist_matrix, result['path'], time_limit=time_limit)
+
+class _LazyRows(dict):
+    """
+    Rows of a NumPy matrix as lists, each converted on first access.
+    """
+
+    def __init__(self, matrix):
+        super().__init__()
+        self.matrix = matrix
+
+    def __missing__(self, i):
+        row = self[i] = self.matrix[i].tolist()
+        return row
+
+def simulated_annealing_tsp(dist_matrix, home_index, time_limit=1.0, seed=None, on_improvement=None,
+                            neighbor_count=10):
+    """
+    Anytime simulated annealing, starting from the nearest-neighbor tour.
+
+    Each step picks a city and one of its ``neighbor_count`` nearest
+    neighbors and proposes moving the city next to it, or on symmetric
+    matrices a 2-opt reversal joining the two; moves are scored in O(1)
+    from the edges they add and remove. The temperature decays
+    geometrically over most of ``time_limit`` seconds, setup included, and
+    the best tour is polished with ``improve_tour`` in whatever is left.
+    ``seed`` makes the search reproducible
+    for a given number of steps. Every new best tour is passed to
+    ``on_improvement`` as ``{'path', 'cost', 'elapsed'}`` while the
+    search continues.
+    """
+    n = len(dist_matrix)
+    start_time = time.perf_counter()
+    if n < 4:
+        start = nearest_neighbor_tsp(dist_matrix, home_index)
+        if on_improvement:
+            on_improvement({'path': start['path'], 'cost': start['cost'], 'elapsed': time.perf_counter() - start_time})
+        return start
+
+    # Setup is O(n^2) and counts against the budget, so each step runs once:
+    # nested lists index fastest, and rows of an array are converted only
+    # when the search first touches them
+    matrix = np.asarray(dist_matrix, dtype=np.float64)
+    d = dist_matrix if isinstance(dist_matrix, list) else _LazyRows(matrix)
+    start_path = nearest_neighbor_tsp(matrix, home_index)['path']
+    current = best_cost = tour_cost(dist_matrix, start_path)
+    if on_improvement:
+        on_improvement({'path': start_path, 'cost': current, 'elapsed': time.perf_counter() - start_time})
+    symmetric = np.array_equal(matrix, matrix.T)
+    neighbors = _neighbor_lists(matrix, neighbor_count)
+    rng = random.Random(seed)
+    tour = start_path[:-1]
+    pos = [0] * n
+    for idx, city in enumerate(tour):
+        pos[city] = idx
+    best_tour = list(tour)
+
+    def closed(order):
+        at = order.index(home_index)
+        return order[at:] + order[:at] + [home_index]
+
+    def propose():
+        x = rng.randrange(n)
+        c = rng.choice(neighbors[x])
+        i, j = pos[x], pos[c]
+        if symmetric and rng.random() < 0.5:
+            # Reverse tour[lo + 1..hi] so that x and c become adjacent
+            lo, hi = min(i, j), max(i, j)
+            if hi - lo < 2 or (lo == 0 and hi == n - 1):
+                return None
+            a, b, e = tour[lo], tour[lo + 1], tour[(hi + 1) % n]
+            c = tour[hi]
+            return 'reverse', lo, hi, d[a][c] + d[b][e] - d[a][b] - d[c][e]
+        # Move x to sit right after c
+        if j == i or j == (i - 1) % n:
+            return None
+        p, nx, e = tour[i - 1], tour[(i + 1) % n], tour[(j + 1) % n]
+        return 'relocate', i, j, d[p][nx] - d[p][x] - d[x][nx] + d[c][x] + d[x][e] - d[c][e]
+
+    # The last tenth of the budget is kept for the final polish
+    anneal_time = 0.9 * time_limit
+
+    # Start hot enough to accept a typical uphill move about half the time
+    uphill = [move[3] for move in (propose() for _ in range(200)) if move and move[3] > 0]
+    start_temperature = sum(uphill) / len(uphill) / math.log(2) if uphill else 1.0
+    end_temperature = start_temperature * 1e-3
+    temperature = start_temperature
+
+    counters = {'iterations': 0, 'accepted_moves': 0, 'improvements': 0}
+    elapsed = time.perf_counter() - start_time
+    while True:
+        if counters['iterations'] % 32 == 0:
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= anneal_time:
+                break
+            temperature = start_temperature * (end_temperature / start_temperature) ** (elapsed / anneal_time)
+        counters['iterations'] += 1
+
+        move = propose()
+        if move is None:
+            continue
+        kind, i, j, delta = move
+        if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+            continue
+
+        if kind == 'reverse':
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+            changed = range(i + 1, j + 1)
+        else:
+            city = tour.pop(i)
+            tour.insert(j + 1 if j < i else j, city)
+            changed = range(min(i, j), max(i, j) + 1)
+        for idx in changed:
+            pos[tour[idx]] = idx
+        current += delta
+        counters['accepted_moves'] += 1
+
+        if current < best_cost - 1e-9:
+            best_cost = current
+            best_tour = list(tour)
+            counters['improvements'] += 1
+            if on_improvement:
+                path = closed(best_tour)
+                on_improvement({'path': path, 'cost': best_cost, 'elapsed': time.perf_counter() - start_time})
+
+    remaining = time_limit - (time.perf_counter() - start_time)
+    if remaining > 0:
+        best = improve_tour(
+            dist_matrix, closed(best_tour), time_limit=remaining, rows=d, neighbors=neighbors, symmetric=symmetric
+        )
+    else:
+        path = closed(best_tour)
+        best = {'path': path, 'cost': tour_cost(dist_matrix, path)}
+    if best['cost'] < best_cost - 1e-9:
+        counters['improvements'] += 1
+        if on_improvement:
+            on_improvement({'path': best['path'], 'cost': best['cost'], 'elapsed': time.perf_counter() - start_time})
+    best['counters'] = counters
+    return best
+
+# Largest set of odd-degree vertices matched exactly; bigger sets use greedy matching
+EXACT_MATCHING_LIMIT = 14
+
+def minimum_spanning_tree(d):
+    """
+    Prim's algorithm on a dense symmetric matrix. Returns the tree edges.
+    """
+    n = len(d)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = d[0].copy()
+    parent = np.zeros(n, dtype=np.intp)
+    edges = []
+
+    for _ in range(n - 1):
+        j = int(np.argmin(np.where(in_tree, np.inf, best)))
+        edges.append((int(parent[j]), j))
+        in_tree[j] = True
+        closer = d[j] < best
+        best[closer] = d[j][closer]
+        parent[closer] = j
+
+    return edges
+
+def _minimum_weight_matching(d, vertices):
+    """
+    Perfect matching of ``vertices`` (an even number of them). Exact, by
+    dynamic programming over subsets, for up to ``EXACT_MATCHING_LIMIT``
+    vertices; greedy, cheapest pair first, above that.
+    """
+    m = len(vertices)
+    w = d[np.ix_(vertices, vertices)]
+
+    if m <= EXACT_MATCHING_LIMIT:
+        w = w.tolist()
+        size = 1 << m
+        cost = [float('inf')] * size
+        choice = [-1] * size
+        cost[0] = 0
+        for mask in range(1, size):
+            if bin(mask).count('1') & 1:
+                continue
+            # The lowest unmatched vertex is paired with some other one
+            i = (mask & -mask).bit_length() - 1
+            rest = mask ^ (1 << i)
+            for j in range(i + 1, m):
+                if (rest >> j) & 1:
+                    c = w[i][j] + cost[rest ^ (1 << j)]
+                    if c < cost[mask]:
+                        cost[mask] = c
+                        choice[mask] = j
+
+        pairs = []
+        mask = size - 1
+        while mask:
+            i = (mask & -mask).bit_length() - 1
+            j = choice[mask]
+            pairs.append((vertices[i], vertices[j]))
+            mask ^= (1 << i) | (1 << j)
+        return pairs
+
+    rows, cols = np.triu_indices(m, k=1)
+    matched = [False] * m
+    pairs = []
+    for idx in np.argsort(w[rows, cols], kind='stable'):
+        i, j = rows[idx], cols[idx]
+        if not matched[i] and not matched[j]:
+            matched[i] = matched[j] = True
+            pairs.append((vertices[i], vertices[j]))
+            if len(pairs) == m // 2:
+                break
+    return pairs
+
+def christofides_tsp(dist_matrix, home_index):
+    """
+    Christofides approximation for metric instances.
+
+    Builds a minimum spanning tree, adds a minimum-weight matching on its
+    odd-degree vertices, walks an Euler tour of the result from
+    ``home_index`` and skips repeated cities. With an exact matching the
+    tour is at most 1.5 times optimal on metric instances; the greedy
+    matching used for large odd sets weakens that bound. Asymmetric
+    matrices are symmetrized by averaging for the construction only.
+    """
+    n = len(dist_matrix)
+    if n == 0:
+        return {'path': [], 'cost': 0}
+
+    d = np.asarray(dist_matrix, dtype=np.float64)
+    if not np.array_equal(d, d.T):
+        d = (d + d.T) / 2
+
+    edges = minimum_spanning_tree(d)
+    degree = [0] * n
+    for a, b in edges:
+        degree[a] += 1
+        degree[b] += 1
+    odd = [v for v in range(n) if degree[v] % 2]
+    edges += _minimum_weight_matching(d, odd)
+
+    # Hierholzer's algorithm over the tree-plus-matching multigraph
+    adjacency = [[] for _ in range(n)]
+    for edge_id, (a, b) in enumerate(edges):
+        adjacency[a].append((b, edge_id))
+        adjacency[b].append((a, edge_id))
+    used = [False] * len(edges)
+    stack = [home_index]
+    circuit = []
+    while stack:
+        v = stack[-1]
+        while adjacency[v] and used[adjacency[v][-1][1]]:
+            adjacency[v].pop()
+        if adjacency[v]:
+            u, edge_id = adjacency[v].pop()
+            used[edge_id] = True
+            stack.append(u)
+        else:
+            circuit.append(stack.pop())
+
+    seen = set()
+    path = []
+    for v in reversed(circuit):
+        if v not in seen:
+            seen.add(v)
+            path.append(v)
+    path.append(home_index)
+
+    return {'path': path, 'cost': tour_cost(dist_matrix, path), 'counters': {'odd_vertices': len(odd)}}
+
+def christofides_2opt_tsp(dist_matrix, home_index, time_limit=1.0):
+    """
+    Christofides tour improved to a 2-opt / Or-opt local optimum.
+    """
+    if len(dist_matrix) == 0:
+        return {'path': [], 'cost': 0}
+    result = christofides_tsp(dist_matrix, home_index)
+    improved = improve_tour(dist_matrix, result['path'], time_limit=time_limit)
+    improved['counters'] = {**result['counters'], **improved.get('counters', {})}
+    return improved
+
+ALGORITHMS = {
+    'Brute Force': brute_force_tsp,
+    'Brute Force (Parallel)': parallel_brute_force_tsp,
+    'Held-Karp': held_karp_tsp,
+    'Held-Karp (NumPy)': held_karp_numpy_tsp,
+    'Branch and Bound': branch_and_bound_tsp,
+    'Nearest Neighbor': nearest_neighbor_tsp,
+    'Nearest Neighbor (Multi-start)': multi_start_nearest_neighbor_tsp,
+    'Nearest Neighbor + 2-opt': nearest_neighbor_2opt_tsp,
+    'Christofides': christofides_tsp,
+    'Christofides + 2-opt': christofides_2opt_tsp,
+    'Simulated Annealing': simulated_annealing_tsp,
+}
+
+DEFAULT_ALGORITHMS = ['Brute Force', 'Held-Karp', 'Nearest Neighbor']
+
+# Added to the default run when no exact algorithm fits the latency target
+DEFAULT_IMPROVEMENT = 'Nearest Neighbor + 2-opt'
+
+# Operation counts and measured throughput used by the dispatcher. Branch
+# and bound varies by orders of magnitude between instances of one size;
+# its model follows the slowest random game instances measured, so it is
+# never scheduled where a bad instance would blow the latency target.
+ALGORITHM_COST_MODELS = {
+    'Brute Force': {
+        'exact': True,
+        'operations': lambda n: math.factorial(max(n - 1, 0)) * n,
+        'ops_per_second': 4e6,
+    },
+    'Brute Force (Parallel)': {
+        'exact': True,
+        'operations': lambda n: math.factorial(max(n - 1, 0)) * n,
+        'ops_per_second': 4e6 * (os.cpu_count() or 1),
+    },
+    'Held-Karp': {
+        'exact': True,
+        'operations': lambda n: n * n * 2 ** n,
+        'ops_per_second': 1e7,
+    },
+    'Held-Karp (NumPy)': {
+        'exact': True,
+        'operations': lambda n: n * n * 2 ** n,
+        'ops_per_second': 1e8,
+    },
+    'Branch and Bound': {
+        'exact': True,
+        'operations': lambda n: n * 3 ** n,
+        'ops_per_second': 1e7,
+    },
+    'Nearest Neighbor': {
+        'exact': False,
+        'operations': lambda n: n * n,
+        'ops_per_second': 1e7,
+    },
+    'Nearest Neighbor (Multi-start)': {
+        'exact': False,
+        'operations': lambda n: n ** 3,
+        'ops_per_second': 5e8,
+    },
+    'Nearest Neighbor + 2-opt': {
+        'exact': False,
+        'operations': lambda n: n * n,
+        'ops_per_second': 1e6,
+    },
+    'Christofides': {
+        'exact': False,
+        'operations': lambda n: n * n * max(math.log2(n), 1),
+        'ops_per_second': 5e7,
+    },
+    'Christofides + 2-opt': {
+        'exact': False,
+        'operations': lambda n: n * n * max(math.log2(n), 1),
+        'ops_per_second': 1e6,
+    },
+    # Runs for its one-second default time limit after O(n^2) setup
+    'Simulated Annealing': {
+        'exact': False,
+        'operations': lambda n: 1e7 + n * n,
+        'ops_per_second': 1e7,
+    },
+}